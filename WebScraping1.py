@@ -1,8 +1,21 @@
+import argparse
+import http_client
+import metrics
+import profiling
+import rate_limit
+import retry
 import requests
-from bs4 import BeautifulSoup
+from parsing import make_soup, only
 import sqlite3
 import time
 import datetime
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Listing pages fetched at the same time, and the page count used when pagination can't be read
+page_workers = 8
+default_page_count = 5
 
 def scrape_job(job):
     job_info = {}
@@ -39,8 +52,12 @@ def scrape_job(job):
     return job_info
 
 # Function to create or connect to the database
-def create_or_connect_db():
-    conn = sqlite3.connect('job_listings.db')
+def create_or_connect_db(db_path='job_listings.db', fast_writes=False):
+    conn = sqlite3.connect(db_path)
+    if fast_writes:
+        # Write-ahead log with fewer fsyncs: safe against app crashes, may lose the last commit on power loss
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
     c = conn.cursor()
     c.execute('''CREATE TABLE IF NOT EXISTS job_listings (
                  id INTEGER PRIMARY KEY,
@@ -51,21 +68,117 @@ def create_or_connect_db():
                  company_name TEXT,
                  due_date TEXT,
                  source TEXT,
-                 timestamp TEXT)''')
+                 timestamp TEXT,
+                 listing_key TEXT)''')
+    migrate_db(conn)
     return conn
 
+# Function to bring databases created by older versions up to date
+def migrate_db(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(job_listings)')]
+    with conn:
+        if 'listing_key' not in columns:
+            # Key existing rows and keep only the most recently seen copy of each listing
+            conn.execute('ALTER TABLE job_listings ADD COLUMN listing_key TEXT')
+            conn.create_function('job_listing_key', 4, job_listing_key)
+            conn.execute('UPDATE job_listings SET listing_key = job_listing_key(position_title, company_name, location, added)')
+            conn.execute('''DELETE FROM job_listings
+                            WHERE id NOT IN (SELECT MAX(id) FROM job_listings GROUP BY listing_key)''')
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_job_listings_key ON job_listings (listing_key)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_job_listings_company ON job_listings (company_name)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_job_listings_due_date ON job_listings (due_date)')
+
+# Function to build the natural key of a listing: title, company, location and added date
+def job_listing_key(position_title, company_name, location, added):
+    parts = [part or '' for part in (position_title, company_name, location, added)]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+# A listing seen again only refreshes its details and last-seen timestamp; details missing this time are kept
+INSERT_JOB_SQL = '''INSERT INTO job_listings (position_title, location, added, salary, company_name, due_date, source, timestamp, listing_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (listing_key) DO UPDATE SET
+                        salary = COALESCE(excluded.salary, salary),
+                        due_date = COALESCE(excluded.due_date, due_date),
+                        source = COALESCE(excluded.source, source),
+                        timestamp = excluded.timestamp'''
+
+# Function to turn a scraped job into a database row
+def job_row(job_info):
+    key = job_listing_key(job_info.get('Position title'), job_info.get('Company name'),
+                          job_info.get('Location'), job_info.get('When the vacancy has been added'))
+    return (job_info.get('Position title'), job_info.get('Location'), job_info.get('When the vacancy has been added'),
+            job_info.get('Salary'), job_info.get('Company name'), job_info.get('Due date'),
+            job_info.get('Source'), job_info.get('Timestamp'), key)
+
 # Function to insert data into the database
 def insert_into_db(conn, job_info):
     c = conn.cursor()
-    c.execute('''INSERT INTO job_listings (position_title, location, added, salary, company_name, due_date, source, timestamp)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-              (job_info.get('Position title'), job_info.get('Location'), job_info.get('When the vacancy has been added'),
-               job_info.get('Salary'), job_info.get('Company name'), job_info.get('Due date'),
-               job_info.get('Source'), job_info.get('Timestamp')))
+    c.execute(INSERT_JOB_SQL, job_row(job_info))
     conn.commit()
 
+# Function to insert many jobs in a single transaction
+def insert_many_into_db(conn, jobs):
+    with conn:
+        conn.executemany(INSERT_JOB_SQL, [job_row(job_info) for job_info in jobs])
+
+# Buffers scraped jobs and writes them in batches, one commit per batch
+class JobWriter:
+    def __init__(self, conn, batch_size=500):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pending = []
+        self.rows_written = 0
+
+    def add(self, job_info):
+        self.pending.append(job_info)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            insert_many_into_db(self.conn, self.pending)
+            self.rows_written += len(self.pending)
+            self.pending = []
+
+# Function to fetch one page of the job board
+def fetch_page(page_num):
+    url = f'https://www.visidarbi.lv/darba-sludinajumi?page={page_num}#results'
+    response = http_client.get(url)
+    # An error page would parse to zero jobs, fail it so it gets retried
+    response.raise_for_status()
+    return response
+
+# Function to find the number of listing pages from the pagination links
+def discover_page_count(soup, default=default_page_count):
+    page_numbers = []
+    for link in soup.find_all('a', href=re.compile(r'[?&]page=\d+')):
+        page_numbers.append(int(re.search(r'[?&]page=(\d+)', link['href']).group(1)))
+    return max(page_numbers) if page_numbers else default
+
+# Name of this scraper in the run metrics
+site_name = 'visidarbi'
+
+# Pages after the first only need the job boxes
+job_scope = only('div', 'item premium big-item')
+
+# Function to parse a listing page and queue its jobs for the database
+def save_jobs(soup, writer):
+    with metrics.timed('extract', site=site_name):
+        jobs = [scrape_job(job_box) for job_box in soup.find_all('div', class_='item premium big-item')]
+    with metrics.timed('write', site=site_name):
+        for job_info in jobs:
+            writer.add(job_info)
+        # Commit each page in one transaction
+        writer.flush()
+    return len(jobs)
+
+# Function to parse a listing page, timed for the run metrics
+def parse_page(content, parse_only=None):
+    with metrics.timed('parse', site=site_name):
+        return make_soup(content, parse_only=parse_only)
+
 # Function to log script execution
-def log_execution(start_time, end_time, num_rows_retrieved, error=None):
+def log_execution(start_time, end_time, num_rows_retrieved, error=None, retried_pages=(), failed_pages=()):
     with open('log.txt', 'a') as f:
         f.write(f"Script started at: {start_time}\n")
         if error:
@@ -73,30 +186,93 @@ def log_execution(start_time, end_time, num_rows_retrieved, error=None):
         else:
             f.write(f"Script ended at: {end_time}\n")
             f.write(f"Script took: {end_time - start_time} seconds\n")
-            f.write(f"Number of data rows retrieved: {num_rows_retrieved}\n\n")
+            f.write(f"Number of data rows retrieved: {num_rows_retrieved}\n")
+            for host, stats in rate_limit.summary().items():
+                f.write(f"Rate for {host}: {stats['rate']} requests/s, {stats['throttled']} throttled, "
+                        f"peak queue {stats['max_queued']}\n")
+            retries = retry.summary()
+            f.write(f"Requests retried: {retries['retries']}, given up: {retries['gave_up']}, "
+                    f"circuits opened: {retries['circuits_opened']}\n")
+            f.write(f"Pages retried at the end: {len(retried_pages)}, still failing: {list(failed_pages)}\n")
+            f.write("\n")
+    # Stage timings, bytes and responses per host go to the structured metrics
+    metrics.emit(run=site_name)
+
+# Parse and save saved listing pages offline, so profiles don't depend on the live site
+def extract_fixture_pages(paths, rounds=1):
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+
+    writer = JobWriter(create_or_connect_db(':memory:'))
+    num_rows_retrieved = 0
+    for _ in range(rounds):
+        for content in pages:
+            num_rows_retrieved += save_jobs(parse_page(content, parse_only=job_scope), writer)
+    writer.flush()
+    return num_rows_retrieved
 
 # Main function to run the script
-def main():
+def main(fast_writes=False):
     start_time = time.time()
     try:
-        conn = create_or_connect_db()
+        conn = create_or_connect_db(fast_writes=fast_writes)
+        writer = JobWriter(conn)
         num_rows_retrieved = 0
-        for page_num in range(1, 6):  # Assuming there are 5 pages to scrape
-            url = f'https://www.visidarbi.lv/darba-sludinajumi?page={page_num}#results'
-            response = requests.get(url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            job_boxes = soup.find_all('div', class_='item premium big-item')
-            for job_box in job_boxes:
-                job_info = scrape_job(job_box)
-                insert_into_db(conn, job_info)
-                num_rows_retrieved += 1
+
+        # The first page tells us how many pages there are
+        soup = parse_page(fetch_page(1).content)
+        page_count = discover_page_count(soup)
+        num_rows_retrieved += save_jobs(soup, writer)
+
+        # Fetch the remaining pages concurrently and parse each one as it arrives
+        retried_pages = []
+        with ThreadPoolExecutor(max_workers=page_workers) as executor:
+            futures = {executor.submit(fetch_page, page_num): page_num for page_num in range(2, page_count + 1)}
+            for future in as_completed(futures):
+                try:
+                    response = future.result()
+                except requests.RequestException:
+                    # Failed even after retries, try it again once the other pages are done
+                    retried_pages.append(futures[future])
+                    continue
+                soup = parse_page(response.content, parse_only=job_scope)
+                num_rows_retrieved += save_jobs(soup, writer)
+
+        failed_pages = []
+        for page_num in sorted(retried_pages):
+            try:
+                soup = parse_page(fetch_page(page_num).content, parse_only=job_scope)
+            except requests.RequestException:
+                failed_pages.append(page_num)
+                continue
+            num_rows_retrieved += save_jobs(soup, writer)
 
         end_time = time.time()
-        log_execution(start_time, end_time, num_rows_retrieved)
+        log_execution(start_time, end_time, num_rows_retrieved, retried_pages=retried_pages,
+                      failed_pages=failed_pages)
     except Exception as e:
         end_time = time.time()
         log_execution(start_time, end_time, num_rows_retrieved, error=str(e))
         raise
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape the job listings of visidarbi.lv")
+    parser.add_argument('--profile', nargs='?', const='profile.pstats', metavar='STATS_FILE',
+                        help='run under cProfile, save the stats and report the hottest extraction code')
+    parser.add_argument('--fixtures', nargs='+', metavar='PAGE',
+                        help='with --profile, extract these saved listing pages offline instead of crawling')
+    parser.add_argument('--rounds', type=int, default=10, help='times each fixture page is extracted')
+    parser.add_argument('--fast-writes', action='store_true',
+                        help='use a write-ahead log with synchronous=NORMAL (may lose the last commit on power loss)')
+    args = parser.parse_args()
+
+    if args.fixtures and not args.profile:
+        parser.error('--fixtures needs --profile')
+    if args.fixtures:
+        profiling.profile(extract_fixture_pages, args.fixtures, rounds=args.rounds, stats_path=args.profile)
+    elif args.profile:
+        profiling.profile(main, fast_writes=args.fast_writes, stats_path=args.profile)
+    else:
+        main(fast_writes=args.fast_writes)
@@ -0,0 +1,74 @@
+import os
+import shutil
+import threading
+
+
+class BlobStore:
+    """Content-addressed storage for downloaded assets.
+
+    Every distinct file is kept once as ``<root>/<hash[:2]>/<hash>`` and the
+    product folders get hard links to it (or a copy where the filesystem
+    can't link), so a swatch or guide used by many products only takes disk
+    space once.
+    """
+
+    def __init__(self, root='asset_store'):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self.lock = threading.Lock()
+        self.linked_files = 0
+        self.linked_bytes = 0
+        self.stored_files = 0
+        self.stored_bytes = 0
+
+    def blob_path(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def has(self, content_hash):
+        return content_hash is not None and os.path.exists(self.blob_path(content_hash))
+
+    def ingest(self, staged_path, content_hash):
+        """Move a finished download into the store, dropping it if the blob already exists."""
+        blob = self.blob_path(content_hash)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        with self.lock:
+            if os.path.exists(blob):
+                os.remove(staged_path)
+                return blob
+            os.replace(staged_path, blob)
+            self.stored_files += 1
+            self.stored_bytes += os.path.getsize(blob)
+        return blob
+
+    def link(self, content_hash, path):
+        """Place the blob at ``path``, replacing whatever is there."""
+        blob = self.blob_path(content_hash)
+        size = os.path.getsize(blob)
+        if not (os.path.exists(path) and os.path.samefile(blob, path)):
+            temp_path = f"{path}.{threading.get_ident()}.link"
+            try:
+                os.link(blob, temp_path)
+            except OSError:
+                shutil.copyfile(blob, temp_path)
+            os.replace(temp_path, path)
+
+        with self.lock:
+            self.linked_files += 1
+            self.linked_bytes += size
+        return path
+
+    def summary(self):
+        megabytes_saved = (self.linked_bytes - self.stored_bytes) / (1024 * 1024)
+        return {
+            'files': self.linked_files,
+            'unique_files': self.stored_files,
+            # Bytes placed per byte newly stored; with no new blobs every file came from earlier runs
+            'dedup_ratio': round(self.linked_bytes / self.stored_bytes, 2) if self.stored_bytes else None,
+            'megabytes_saved': round(max(megabytes_saved, 0), 2),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        ratio = stats['dedup_ratio'] if stats['dedup_ratio'] is not None else 'n/a (no new blobs)'
+        print(f"Asset store: {stats['files']} files placed from {stats['unique_files']} new blobs, "
+              f"dedup ratio {ratio}, {stats['megabytes_saved']} MB saved")
@@ -0,0 +1,293 @@
+import asyncio
+import contextlib
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from tqdm import tqdm
+
+import http_archive
+import http_client
+import metrics
+import rate_limit
+import retry
+from downloader import BaseDownloader, chunk_size, hash_part
+from engine import Run, extract_product
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Exceptions of the async fetch path worth trying again
+network_errors = (aiohttp.ClientError, asyncio.TimeoutError) if aiohttp else ()
+
+# Product pages being fetched or parsed at the same time
+page_concurrency = 64
+
+# Queued downloads after which product pages wait for the downloads to catch up
+max_pending_downloads = 2000
+
+
+async def stream_to_file_async(response, part_path, resume=False):
+    """``stream_to_file`` for an aiohttp response."""
+    written, digest = hash_part(part_path) if resume else (0, hashlib.sha256())
+    with open(part_path, 'ab' if resume else 'wb') as file:
+        async for chunk in response.content.iter_chunked(chunk_size):
+            file.write(chunk)
+            digest.update(chunk)
+            written += len(chunk)
+    return written, digest.hexdigest()
+
+
+@contextlib.asynccontextmanager
+async def limited_get(session, url, headers=None):
+    """``session.get`` with the rate limiting, retries and circuit breaking of ``http_client.get``."""
+    host = urlparse(url).netloc
+    limiter = rate_limit.limiter_for(url)
+    breaker = retry.breaker_for(url)
+    attempt = 0
+    while True:
+        breaker.check()
+        with metrics.timed('rate_wait', host=host):
+            await limiter.wait_async()
+        start = time.perf_counter()
+        try:
+            response = await session.get(http_archive.replay_url(url), headers=headers)
+        except network_errors as error:
+            metrics.count('errors', host=host, error=type(error).__name__)
+            delay = retry.next_delay(url, attempt, error=error)
+            if delay is None:
+                raise
+        else:
+            latency = time.perf_counter() - start
+            metrics.observe('fetch', latency, host=host)
+            metrics.count('responses', host=host, status=response.status)
+            retry_after = response.headers.get('Retry-After')
+            limiter.observe(response.status, latency, retry_after)
+            delay = retry.next_delay(url, attempt, status=response.status, retry_after=retry_after)
+            if delay is None:
+                break
+            response.release()
+        await asyncio.sleep(delay)
+        attempt += 1
+
+    try:
+        yield response
+    finally:
+        response.release()
+
+
+def connection_trace():
+    """aiohttp trace hooks timing DNS lookups and new connections (TCP and TLS) per host."""
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.host = urlparse(str(params.url)).netloc
+
+    async def on_dns_start(session, context, params):
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, context, params):
+        metrics.observe('dns', time.perf_counter() - context.dns_start, host=context.host)
+
+    async def on_connection_start(session, context, params):
+        context.connection_start = time.perf_counter()
+
+    async def on_connection_end(session, context, params):
+        metrics.observe('connect', time.perf_counter() - context.connection_start, host=context.host)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_dns_resolvehost_start.append(on_dns_start)
+    trace.on_dns_resolvehost_end.append(on_dns_end)
+    trace.on_connection_create_start.append(on_connection_start)
+    trace.on_connection_create_end.append(on_connection_end)
+    return trace
+
+
+class AsyncAssetDownloader(BaseDownloader):
+    """Download product assets as tasks on the running event loop.
+
+    Behaves like ``AssetDownloader`` (cache, store, manifest and Range resume
+    all apply), but every download is a coroutine sharing one aiohttp session,
+    whose connector limits the connections per host.
+    """
+
+    def __init__(self, cache=None, store=None, manifest=None):
+        super().__init__(cache=cache, store=store, manifest=manifest)
+        self.session = None
+        self.pending = set()
+
+    def submit(self, url, path=None, folder=None, label='image', once=False):
+        first = self.url_futures.get(url) if self.store else None
+        if first is None:
+            task = asyncio.ensure_future(self._fetch(url, path, folder, label, once))
+            self.url_futures[url] = task
+        else:
+            task = asyncio.ensure_future(self._link_duplicate(url, first, path, folder, label, once))
+        self.futures.append(task)
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        return task
+
+    async def _link_duplicate(self, url, first, path, folder, label, once):
+        return self.link_duplicate(url, await first, path, folder, label, once)
+
+    async def _fetch(self, url, path, folder, label, once=False):
+        try:
+            return await self._download(url, path, folder, label, once)
+        except network_errors + (retry.CircuitOpenError,) as error:
+            self.count_failure((url, path, folder, label, once), error)
+            return None
+
+    async def _download(self, url, path, folder, label, once=False):
+        known_path = self.known_path(url, path, folder, once)
+        if known_path:
+            return known_path
+
+        part_path, headers, offset = self.request_headers(url, path, folder)
+        async with limited_get(self.session, url, headers) as response:
+            settled, path = self.check_response((url, path, folder, label, once), response, response.status, part_path)
+            if settled:
+                return path
+            with metrics.timed('download', host=urlparse(url).netloc):
+                size, content_hash = await stream_to_file_async(response, part_path, resume=response.status == 206)
+        return self.received(url, response, response.status, part_path, path, offset, size, content_hash)
+
+    async def drain(self, limit):
+        """Wait until no more than ``limit`` downloads are unfinished."""
+        while len(self.pending) > limit:
+            await asyncio.wait(set(self.pending), return_when=asyncio.FIRST_COMPLETED)
+
+    async def join(self):
+        """Wait for every queued download and retry the failed ones once, then raise the first error any hit."""
+        results = await asyncio.gather(*self.futures, return_exceptions=True)
+        results += await asyncio.gather(*[self.submit(*job) for job in self.start_replay()],
+                                        return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def wait(self):
+        # The downloads were awaited on the loop by ``join``
+        return self.summary()
+
+
+class AsyncRun(Run):
+    """A ``Run`` whose product pages and assets are fetched on one asyncio event loop.
+
+    ``page_concurrency`` worker coroutines take products from the listing,
+    fetch their pages and hand them to a thread pool for parsing, so
+    BeautifulSoup never blocks the loop (or to ``parse_processes`` worker
+    processes when parsing is what limits the crawl). Assets are downloaded as
+    tasks on the same loop. aiohttp's connector caps the open connections at
+    ``max_connections`` overall and ``per_host`` per host, and the page workers
+    pause while more than ``max_pending_downloads`` downloads are queued.
+    """
+
+    def __init__(self, site, max_connections=100, per_host=4, parse_workers=None, dedup=True,
+                 output_format=None, parse_processes=0, thumbnails=False, snapshots=True):
+        if aiohttp is None:
+            raise ImportError("The async crawl mode needs aiohttp: pip install aiohttp")
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.session = None
+        super().__init__(site, per_host=per_host, dedup=dedup, output_format=output_format,
+                         parse_processes=parse_processes, thumbnails=thumbnails, snapshots=snapshots)
+        if self.parse_pool is None:
+            self.parse_pool = ThreadPoolExecutor(max_workers=parse_workers)
+        # Files of each shared asset, listed on a thread so a blocking request never stalls the loop
+        self.expansions = {}
+
+    def make_downloader(self, max_workers, per_host):
+        return AsyncAssetDownloader(cache=self.cache, store=self.store, manifest=self.manifest)
+
+    async def crawl(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host)
+        connect_timeout, read_timeout = http_client.settings['timeout']
+        timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         trace_configs=[connection_trace()]) as session:
+            self.session = self.downloader.session = session
+            loop = asyncio.get_running_loop()
+            products = await loop.run_in_executor(None, self.fetch_listing)
+
+            progress = tqdm(total=len(products), desc="Downloading Products", unit="product")
+            remaining = iter(products)
+
+            async def page_worker():
+                # Workers share one iterator, so each product is taken exactly once
+                for product in remaining:
+                    await self.scrape_product_async(product)
+                    progress.update()
+                    await self.downloader.drain(max_pending_downloads)
+
+            try:
+                await asyncio.gather(*(page_worker() for _ in range(page_concurrency)))
+            finally:
+                progress.close()
+            await asyncio.gather(*(self.scrape_product_async(product) for product in self.retry_failed_products()))
+            for product_asset in self.retry_failed_shared():
+                self.queue_shared(product_asset, await loop.run_in_executor(None, self.expand_shared, product_asset))
+            await self.downloader.join()
+
+    async def fetch_page(self, url, headers=None):
+        async with limited_get(self.session, url, headers) as response:
+            content = await response.read()
+        metrics.count('bytes', len(content), host=urlparse(url).netloc)
+        return response, content
+
+    async def scrape_product_async(self, product):
+        if self.skip_product(product):
+            return
+
+        product_link = product['product_link']
+        csv_file_path = self.csv_path(product)
+        try:
+            response, content = await self.fetch_page(product_link,
+                                                      self.cache.conditional_headers(product_link, csv_file_path))
+            unchanged = self.cache.check_page(product_link, csv_file_path, response.status, response, content)
+            action = self.page_action(product_link, unchanged, response.status)
+            if action == 'skip':
+                return
+            if action == 'refetch':
+                response, content = await self.fetch_page(product_link)
+        except network_errors + (retry.CircuitOpenError,) as error:
+            self.product_failed(product, error)
+            return
+        if not self.accept_page(product, response.status, content):
+            return
+
+        loop = asyncio.get_running_loop()
+        product, assets, timings = await loop.run_in_executor(self.parse_pool, extract_product, self.site, product,
+                                                              content)
+        await self.expand_shared_assets(assets)
+        self.save_extracted((product, assets, timings))
+
+    async def expand_shared_assets(self, assets):
+        loop = asyncio.get_running_loop()
+        shared_urls = [product_asset['url'] for product_asset in assets if product_asset['shared'] is not None]
+        for product_asset in assets:
+            if product_asset['shared'] is not None and product_asset['url'] not in self.expansions:
+                self.expansions[product_asset['url']] = loop.run_in_executor(None, self.expand_shared, product_asset)
+        await asyncio.gather(*(self.expansions[url] for url in shared_urls))
+
+    def shared_files(self, product_asset):
+        # Listed off the loop by expand_shared_assets before the product was saved
+        return self.expansions[product_asset['url']].result()
+
+
+def run_async(site, max_connections=100, per_host=4, parse_workers=None, dedup=True, output_format=None,
+              parse_processes=0, thumbnails=False, snapshots=True):
+    """Like ``engine.run``, with every request of the crawl made from one asyncio event loop."""
+    crawl = AsyncRun(site, max_connections=max_connections, per_host=per_host, parse_workers=parse_workers,
+                     dedup=dedup, output_format=output_format, parse_processes=parse_processes,
+                     thumbnails=thumbnails, snapshots=snapshots)
+    completed = False
+    try:
+        asyncio.run(crawl.crawl())
+        completed = True
+    finally:
+        crawl.finish(completed)
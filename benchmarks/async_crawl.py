@@ -0,0 +1,88 @@
+import argparse
+import contextlib
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rate_limit
+from async_engine import run_async
+from engine import run
+from sites.lano import LanoSite
+
+from slow_server import listing_path, requests_per_crawl
+
+
+def stand_in_site(port):
+    class StandInSite(LanoSite):
+        name = 'stand_in'
+        base_url = f'http://127.0.0.1:{port}'
+        listing_url = f'http://127.0.0.1:{port}{listing_path}'
+        # The stand-in has no sitemap; inheriting Lano's would send a live request in the timed region
+        sitemap_url = None
+        output_dir = 'stand_in_products'
+    return StandInSite()
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(('127.0.0.1', port), timeout=0.2):
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"Stand-in server did not start on port {port}")
+
+
+def measure(crawl, site):
+    # Each mode starts from an empty working directory, so nothing is cached or already on disk
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                crawl(site)
+            return time.perf_counter() - wall_start, time.process_time() - cpu_start
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Crawl a slow local stand-in site with one worker, threaded and async.')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds before every response')
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--connections', type=int, default=200, help='open connections in async mode')
+    args = parser.parse_args()
+
+    # The server runs in its own process so its CPU time isn't counted against the crawlers
+    server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'slow_server.py')
+    server = subprocess.Popen([sys.executable, server_script, '--port', str(args.port),
+                               '--latency', str(args.latency), '--products', str(args.products)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(args.port)
+        site = stand_in_site(args.port)
+        # The stand-in never throttles, so let every mode go as fast as its concurrency allows
+        rate_limit.configure(rate=100000, max_rate=100000, burst=100000)
+        requests_made = requests_per_crawl(args.products)
+
+        modes = [
+            ('engine-1-worker', lambda s: run(s, max_workers=1, per_host=1)),
+            ('threaded', lambda s: run(s, max_workers=8, per_host=8)),
+            ('async', lambda s: run_async(s, max_connections=args.connections, per_host=args.connections)),
+        ]
+        print(f"{requests_made} requests per crawl, {args.latency * 1000:.0f} ms server latency")
+        print(f"{'mode':<15} {'seconds':>8} {'requests/s':>11} {'CPU s':>7} {'CPU ms/request':>15}")
+        for mode, crawl in modes:
+            wall, cpu = measure(crawl, site)
+            print(f"{mode:<15} {wall:>8.2f} {requests_made / wall:>11.1f} {cpu:>7.2f} "
+                  f"{cpu * 1000 / requests_made:>15.2f}")
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_root)
+
+from replay_server import ReplayServer
+
+# The scripts as they are run in production, each against the same replayed archive
+scripts = (
+    'WebScraping1.py',
+    'bolon_scraper.py',
+    'fletcocarpets_scraper.py',
+    'lano_hospitality_scraper.py',
+    'lano_smartstand_scraper.py',
+    'tapibel_scraper.py',
+)
+
+# Runs a script as __main__ after applying rate limit settings passed as JSON
+runner = ("import json, runpy, sys, rate_limit; rate_limit.configure(**json.loads(sys.argv[1])); "
+          "sys.argv = sys.argv[2:]; runpy.run_path(sys.argv[0], run_name='__main__')")
+
+
+def read_metrics(path):
+    totals = {'requests': 0, 'parse_seconds': 0.0}
+    if not os.path.exists(path):
+        return totals
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            record = json.loads(line)
+            if record['metric'] == 'responses':
+                totals['requests'] += record['value']
+            elif record['metric'] == 'parse_seconds':
+                totals['parse_seconds'] += record['sum']
+    return totals
+
+
+def run_script(script, replay_url, rate_limits):
+    """Run ``script`` in a fresh working directory and return its wall time, peak memory and metrics."""
+    with tempfile.TemporaryDirectory() as workdir:
+        metrics_path = os.path.join(workdir, 'metrics.jsonl')
+        env = dict(os.environ, SCRAPER_REPLAY=replay_url, SCRAPER_METRICS=metrics_path,
+                   PYTHONPATH=os.pathsep.join(filter(None, (repo_root, os.environ.get('PYTHONPATH')))))
+        env.pop('SCRAPER_RECORD', None)
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-c', runner, json.dumps(rate_limits),
+                                    os.path.join(repo_root, script)],
+                                   cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if hasattr(os, 'wait4'):
+            # The child's own resource usage; ru_maxrss is in kilobytes on Linux
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_megabytes = usage.ru_maxrss / 1024
+        else:
+            process.wait()
+            peak_megabytes = None
+        wall = time.perf_counter() - start
+        return {'seconds': wall, 'exit_code': process.returncode, 'peak_megabytes': peak_megabytes,
+                **read_metrics(metrics_path)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run every scraper against a replayed HTTP archive.')
+    parser.add_argument('archive', help='archive written by scrape.py --record or SCRAPER_RECORD')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds before every response')
+    parser.add_argument('--bandwidth', type=float, help='bytes per second per connection, unlimited by default')
+    parser.add_argument('--scripts', nargs='+', choices=scripts, default=scripts)
+    parser.add_argument('--unthrottled', action='store_true',
+                        help='lift the per-host rate limits, to measure the scrapers rather than the limiter')
+    args = parser.parse_args()
+
+    server = ReplayServer(args.port, args.archive, args.latency, args.bandwidth)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    replay_url = f'http://127.0.0.1:{args.port}'
+    rate_limits = {'rate': 100000, 'max_rate': 100000, 'burst': 100000} if args.unthrottled else {}
+
+    bandwidth = f"{args.bandwidth / 1024:.0f} KB/s" if args.bandwidth else "unlimited bandwidth"
+    print(f"Replaying {server.archive.summary()['responses']} responses, "
+          f"{args.latency * 1000:.0f} ms latency, {bandwidth}")
+    print(f"{'script':<30} {'seconds':>8} {'requests':>9} {'requests/s':>11} {'parse s':>8} {'peak MB':>8} "
+          f"{'connections':>12} {'reused':>7} {'misses':>7}")
+    try:
+        for script in args.scripts:
+            server.reset_stats()
+            result = run_script(script, replay_url, rate_limits)
+            served = dict(server.stats)
+            # Every request beyond the first on a connection saved a TCP (and, live, a TLS) handshake
+            reused = served['requests'] + served['misses'] - served['connections']
+            peak = f"{result['peak_megabytes']:.0f}" if result['peak_megabytes'] is not None else 'n/a'
+            line = (f"{script:<30} {result['seconds']:>8.2f} {result['requests']:>9} "
+                    f"{result['requests'] / result['seconds']:>11.1f} {result['parse_seconds']:>8.2f} "
+                    f"{peak:>8} {served['connections']:>12} {reused:>7} {served['misses']:>7}")
+            if result['exit_code']:
+                line += f"  (exited with {result['exit_code']})"
+            print(line, flush=True)
+    finally:
+        server.shutdown()
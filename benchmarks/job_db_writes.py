@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from WebScraping1 import JobWriter, create_or_connect_db, insert_into_db
+
+# Number of synthetic job listings written by each variant
+num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+
+def synthetic_jobs(count):
+    for i in range(count):
+        yield {
+            'Position title': f'Position {i}',
+            'Location': 'Riga',
+            'When the vacancy has been added': '2024-01-01',
+            'Salary': f'{1000 + i % 500} EUR',
+            'Company name': f'Company {i % 1000}',
+            'Due date': '2024-02-01',
+            'Source': 'visidarbi.lv',
+            'Timestamp': '2024-01-01 12:00:00',
+        }
+
+
+def row_per_commit(conn, count):
+    for job_info in synthetic_jobs(count):
+        insert_into_db(conn, job_info)
+
+
+def batched(conn, count, batch_size=500):
+    writer = JobWriter(conn, batch_size=batch_size)
+    for job_info in synthetic_jobs(count):
+        writer.add(job_info)
+    writer.flush()
+
+
+def run(name, write, fast_writes=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = create_or_connect_db(os.path.join(tmp, 'job_listings.db'), fast_writes=fast_writes)
+        start = time.perf_counter()
+        write(conn, num_rows)
+        elapsed = time.perf_counter() - start
+        conn.close()
+    print(f"{name:<28} {num_rows / elapsed:>12,.0f} rows/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    print(f"Writing {num_rows:,} synthetic rows")
+    run('row per commit', row_per_commit)
+    run('batched', batched)
+    run('batched + WAL', batched, fast_writes=True)
@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsing import available_backends, make_soup
+
+# Times each saved page is parsed per backend
+rounds = 5
+
+
+def benchmark(pages, parser):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            make_soup(page, parser)
+    elapsed = time.perf_counter() - start
+    return len(pages) * rounds / elapsed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/parse_backends.py page.html [page.html ...]")
+        sys.exit(1)
+
+    pages = []
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as file:
+            pages.append(file.read())
+
+    print(f"Parsing {len(pages)} saved pages x {rounds} rounds")
+    for parser in available_backends():
+        print(f"{parser:<12} {benchmark(pages, parser):>10.1f} pages/s")
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import extract_product
+from sites import SITES
+
+# Times each saved page is extracted per worker count
+rounds = 5
+worker_counts = (1, 2, 4, 8)
+
+
+def jobs(pages):
+    for _ in range(rounds):
+        for index, page in enumerate(pages):
+            yield {'product_name': f'Fixture {index}', 'product_link': f'fixture-{index}'}, page
+
+
+def in_process(site, pages):
+    start = time.perf_counter()
+    for product, page in jobs(pages):
+        extract_product(site, product, page)
+    return len(pages) * rounds / (time.perf_counter() - start)
+
+
+def process_pool(site, pages, workers):
+    products, contents = zip(*jobs(pages))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start the workers before timing, as a crawl keeps them for the whole run
+        list(pool.map(abs, range(workers)))
+        start = time.perf_counter()
+        list(pool.map(extract_product, [site] * len(products), products, contents, chunksize=4))
+        return len(pages) * rounds / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in SITES:
+        print(f"Usage: python benchmarks/parse_pool.py {{{','.join(sorted(SITES))}}} page.html [page.html ...]")
+        sys.exit(1)
+
+    site = SITES[sys.argv[1]]
+    pages = []
+    for path in sys.argv[2:]:
+        with open(path, 'rb') as file:
+            pages.append(file.read())
+
+    print(f"Extracting {len(pages)} saved {site.name} pages x {rounds} rounds on {os.cpu_count()} cores")
+    baseline = in_process(site, pages)
+    print(f"{'in process':<12} {baseline:>10.1f} pages/s")
+    for workers in worker_counts:
+        rate = process_pool(site, pages, workers)
+        print(f"{f'{workers} workers':<12} {rate:>10.1f} pages/s  x{rate / baseline:.2f}")
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsing import make_soup, only
+
+# Times each saved page is parsed per variant
+rounds = 5
+
+
+def benchmark(pages, parse_only):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            soup = make_soup(page, parse_only=parse_only)
+    elapsed = time.perf_counter() - start
+    tree_size = sum(1 for _ in soup.descendants)
+    return len(pages) * rounds / elapsed, tree_size
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python benchmarks/partial_parsing.py <tag> <class|-> page.html [page.html ...]")
+        print("Example: python benchmarks/partial_parsing.py div page-wrap lano_product.html")
+        sys.exit(1)
+
+    tag, class_ = sys.argv[1], sys.argv[2]
+    scope = only(tag, None if class_ == '-' else class_)
+
+    pages = []
+    for path in sys.argv[3:]:
+        with open(path, 'rb') as file:
+            pages.append(file.read())
+
+    print(f"Parsing {len(pages)} saved pages x {rounds} rounds")
+    for name, parse_only in (('full page', None), (f'only {tag}.{class_}', scope)):
+        pages_per_second, tree_size = benchmark(pages, parse_only)
+        print(f"{name:<32} {pages_per_second:>10.1f} pages/s, {tree_size:>8} nodes in last tree")
@@ -0,0 +1,104 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_archive import HttpArchive
+
+# Bytes written between bandwidth pauses
+write_size = 16 * 1024
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        # Requests arrive as /<host>/<path>?<query>, see http_archive.replay_url
+        recorded = server.archive.lookup(self.path.lstrip('/'))
+        if recorded is None:
+            server.count('misses')
+            self.send_error(404, 'Not in the archive')
+            return
+        server.count('requests')
+        status, headers, body = recorded
+
+        # Validators are answered like the site would, so second runs can be replayed too
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if (etag and self.headers.get('If-None-Match') == etag) or \
+                (last_modified and self.headers.get('If-Modified-Since') == last_modified):
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        for start in range(0, len(body), write_size):
+            chunk = body[start:start + write_size]
+            self.wfile.write(chunk)
+            if server.bandwidth:
+                time.sleep(len(chunk) / server.bandwidth)
+        server.count('bytes', len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Serve the responses of an ``http_archive`` recording with a delay and a bandwidth cap.
+
+    ``latency`` is waited before every response and ``bandwidth`` (bytes per
+    second, per connection) limits how fast bodies are sent. New connections
+    are counted, so a run shows how many handshakes keep-alive saved it.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, port, archive_path, latency=0.05, bandwidth=None):
+        super().__init__(('127.0.0.1', port), ReplayHandler)
+        self.archive = HttpArchive(archive_path)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+
+    def process_request(self, request, client_address):
+        # Called once per accepted connection, however many requests it then carries
+        self.count('connections')
+        super().process_request(request, client_address)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.stats[name] += value
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats.update(connections=0, requests=0, misses=0, bytes=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a recorded HTTP archive locally.')
+    parser.add_argument('archive', help='archive written by scrape.py --record or SCRAPER_RECORD')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds before every response')
+    parser.add_argument('--bandwidth', type=float, help='bytes per second per connection, unlimited by default')
+    args = parser.parse_args()
+
+    server = ReplayServer(args.port, args.archive, args.latency, args.bandwidth)
+    print(f"Replaying {server.archive.summary()['responses']} responses on http://127.0.0.1:{args.port}; "
+          f"run the scrapers with SCRAPER_REPLAY=http://127.0.0.1:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        print(f"Served {server.stats}")
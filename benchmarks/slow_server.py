@@ -0,0 +1,102 @@
+import argparse
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Synthetic catalogue in the Lano page layout, so LanoSite can scrape it
+listing_path = '/en/hospitality'
+
+
+def listing_page(products):
+    items = ''.join(f'<li><div class="va-m"><a href="/en/products/{index}">Product {index}</a></div></li>'
+                    for index in range(products))
+    return f'<html><body><ul class="product-overview">{items}</ul></body></html>'
+
+
+def product_page(base_url, index, images, colours):
+    slides = ''.join(f'<img src="{base_url}/media/{index}/slide-{image}.jpg">' for image in range(images))
+    thumbs = ''.join(f'<li><img src="{base_url}/media/{index}/colour-{colour}.jpg"></li>'
+                     for colour in range(colours))
+    details = ''.join(f'<dt>Property {row}</dt><dd>Value {row}</dd>' for row in range(10))
+    return f'''<html><body><div class="page-wrap">
+        <div class="product-slideshow-wrapper"><div class="cycle-slideshow">{slides}</div></div>
+        <div class="description"><p>Product {index} description</p></div>
+        <ul class="product-thumbs">{thumbs}</ul>
+        <dl class="product-data">{details}</dl>
+        <ul class="tools"><li><a title="Download PDF" href="{base_url}/pdf/{index}.pdf">PDF</a></li></ul>
+        </div></body></html>'''
+
+
+def requests_per_crawl(products, images=3, colours=2):
+    # Listing, then each product's page, images, colours and PDF
+    return 1 + products * (1 + images + colours + 1)
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        base_url = f"http://{self.headers['Host']}"
+        parts = self.path.strip('/').split('/')
+
+        if random.random() < server.error_rate:
+            # A flaky host, for exercising the retries
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if self.path == listing_path:
+            body, content_type = listing_page(server.products).encode(), 'text/html'
+        elif parts[:2] == ['en', 'products']:
+            body = product_page(base_url, parts[2], server.images, server.colours).encode()
+            content_type = 'text/html'
+        elif parts[0] in ('media', 'pdf'):
+            # Distinct content per URL, so the asset store can't deduplicate it
+            body, content_type = self.path.encode().ljust(server.asset_size, b'\0'), 'application/octet-stream'
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, port, latency=0.05, products=100, images=3, colours=2, asset_size=20 * 1024,
+                 error_rate=0.0):
+        super().__init__(('127.0.0.1', port), SlowHandler)
+        self.error_rate = error_rate
+        self.latency = latency
+        self.products = products
+        self.images = images
+        self.colours = colours
+        self.asset_size = asset_size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a synthetic product catalogue with a fixed delay per request.')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds before every response')
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--images', type=int, default=3, help='slideshow images per product')
+    parser.add_argument('--colours', type=int, default=2, help='colour swatches per product')
+    parser.add_argument('--asset-size', type=int, default=20 * 1024, help='bytes per image or PDF')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    server = SlowServer(args.port, args.latency, args.products, args.images, args.colours, args.asset_size,
+                        args.error_rate)
+    print(f"Serving {args.products} products on http://127.0.0.1:{args.port}{listing_path}", flush=True)
+    server.serve_forever()
@@ -0,0 +1,138 @@
+import csv
+import json
+import os
+
+# Columns every catalogue starts with; the rest follow in alphabetical order
+leading_columns = ['site', 'product_link', 'product_name']
+
+# Rows handed to the Parquet writer at a time
+parquet_batch_size = 1000
+
+formats = ('jsonl', 'csv', 'parquet')
+
+
+def flatten(product, prefix=''):
+    """Flatten nested dicts such as Bolon's Rolls/Tiles tables into ``Rolls.Width`` style columns."""
+    flat = {}
+    for key, value in product.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix=f"{column}."))
+        elif isinstance(value, (list, tuple)):
+            flat[column] = '\n'.join(str(item) for item in value)
+        else:
+            flat[column] = value
+    return flat
+
+
+def read_catalogue(path, fmt):
+    """Yield the records of an existing catalogue file."""
+    if fmt == 'jsonl':
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Last line cut off by an interrupted run
+                    continue
+    elif fmt == 'csv':
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                yield {key: value for key, value in row.items() if value != ''}
+    else:
+        import pyarrow.parquet as pq
+        for row in pq.read_table(path).to_pylist():
+            yield {key: value for key, value in row.items() if value is not None}
+
+
+class CatalogueWriter:
+    """Streams every product of a run into one JSON Lines, CSV or Parquet file.
+
+    Records are appended to ``<path>.part.jsonl`` as products are scraped. CSV
+    and Parquet need the full column set for their header, so ``close`` converts
+    the part file in a second streaming pass. Products skipped because their
+    page is unchanged are carried over from the previous catalogue, so every
+    run produces the complete catalogue.
+    """
+
+    def __init__(self, path, fmt='jsonl'):
+        if fmt not in formats:
+            raise ValueError(f"Unknown catalogue format {fmt!r}, expected one of {', '.join(formats)}")
+        if fmt == 'parquet':
+            import pyarrow  # noqa: F401  (fail before crawling, not after)
+
+        self.path = path
+        self.format = fmt
+        self.part_path = f"{path}.part.jsonl"
+
+        # The last complete catalogue, plus whatever an interrupted run managed to write
+        self.previous = {}
+        if os.path.exists(path):
+            self.previous.update((record['product_link'], record) for record in read_catalogue(path, fmt))
+        if os.path.exists(self.part_path):
+            self.previous.update((record['product_link'], record) for record in read_catalogue(self.part_path, 'jsonl'))
+
+        self.columns = set(leading_columns)
+        self.rows = 0
+        self.file = open(self.part_path, 'w', encoding='utf-8')
+
+    def write(self, site_name, product_link, product):
+        record = {'site': site_name, 'product_link': product_link}
+        record.update(flatten(product))
+        self._append(record)
+
+    def carry_over(self, product_link):
+        """Copy an unchanged product from the previous catalogue; returns False if it isn't there."""
+        record = self.previous.get(product_link)
+        if record is None:
+            return False
+        self._append(record)
+        return True
+
+    def _append(self, record):
+        self.columns.update(record)
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.rows += 1
+
+    def schema(self):
+        return leading_columns + sorted(self.columns - set(leading_columns))
+
+    def close(self):
+        self.file.close()
+        if self.format == 'jsonl':
+            os.replace(self.part_path, self.path)
+        else:
+            temp_path = f"{self.path}.tmp"
+            if self.format == 'csv':
+                self._write_csv(temp_path)
+            else:
+                self._write_parquet(temp_path)
+            os.replace(temp_path, self.path)
+            os.remove(self.part_path)
+        print(f"Catalogue: {self.rows} products, {len(self.columns)} columns written to {self.path}")
+
+    def _write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=self.schema())
+            writer.writeheader()
+            for record in read_catalogue(self.part_path, 'jsonl'):
+                writer.writerow(record)
+
+    def _write_parquet(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Every column is a nullable string, so the schema doesn't depend on which products were seen
+        columns = self.schema()
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        with pq.ParquetWriter(path, schema) as writer:
+            batch = []
+            for record in read_catalogue(self.part_path, 'jsonl'):
+                batch.append({column: None if record.get(column) is None else str(record[column])
+                              for column in columns})
+                if len(batch) >= parquet_batch_size:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    batch = []
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
@@ -0,0 +1,107 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+
+class ChangeTracker:
+    """Every product a site listed, with the sitemap ``<lastmod>`` of its page when it was last scraped.
+
+    A product whose sitemap ``lastmod`` still matches, and whose CSV is still
+    on disk, is ``unchanged`` and needs no request at all. Products the last
+    runs listed but this run's listing doesn't are flagged as removed.
+    """
+
+    def __init__(self, site_name, db_path='product_changes.db'):
+        self.site_name = site_name
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS products (
+                                 site TEXT,
+                                 product_link TEXT,
+                                 product_name TEXT,
+                                 lastmod TEXT,
+                                 seen_at TEXT,
+                                 removed_at TEXT,
+                                 PRIMARY KEY (site, product_link))''')
+        rows = self.conn.execute('''SELECT product_link, product_name, lastmod, removed_at FROM products
+                                    WHERE site = ?''', (site_name,)).fetchall()
+        self.previous = {link: {'product_name': name, 'lastmod': lastmod, 'removed_at': removed_at}
+                         for link, name, lastmod, removed_at in rows}
+        # This run's sitemap, and the products its listing returned
+        self.lastmods = {}
+        self.listed = set()
+        # Unchanged products the run did skip, counted by the run once it decided to
+        self.skipped = 0
+        self.removed = []
+
+    def start(self, products, lastmods):
+        self.listed = {product['product_link'] for product in products}
+        self.lastmods = lastmods
+
+    def unchanged(self, product_link, path):
+        """Whether the sitemap says ``product_link`` hasn't changed since it was scraped into ``path``."""
+        lastmod = self.lastmods.get(product_link)
+        previous = self.previous.get(product_link)
+        if not lastmod or previous is None or previous['removed_at'] or previous['lastmod'] != lastmod:
+            return False
+        return os.path.exists(path)
+
+    def record(self, product_link, product_name=None, up_to_date=True):
+        """Remember that ``product_link`` is up to date on disk as of this run's sitemap.
+
+        A product that is listed but not ``up_to_date``, e.g. missing assets,
+        is recorded without a lastmod so the next run fetches it again.
+        """
+        lastmod = self.lastmods.get(product_link) if up_to_date else None
+        with self.lock, self.conn:
+            self.conn.execute('''INSERT INTO products (site, product_link, product_name, lastmod, seen_at, removed_at)
+                                 VALUES (?, ?, ?, ?, ?, NULL)
+                                 ON CONFLICT (site, product_link) DO UPDATE SET
+                                 product_name = COALESCE(excluded.product_name, product_name),
+                                 lastmod = excluded.lastmod, seen_at = excluded.seen_at, removed_at = NULL''',
+                              (self.site_name, product_link, product_name, lastmod, time.strftime('%Y-%m-%d %H:%M:%S')))
+
+    def flag_removed(self, output_dir):
+        """Mark products missing from this run's listing as removed, and list them in a CSV next to the products."""
+        if not self.listed:
+            # An empty listing means the site couldn't be read, not that every product is gone
+            return []
+        now = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.removed = [link for link, previous in self.previous.items()
+                        if link not in self.listed and not previous['removed_at']]
+        with self.lock, self.conn:
+            self.conn.executemany('UPDATE products SET removed_at = ? WHERE site = ? AND product_link = ?',
+                                  [(now, self.site_name, link) for link in self.removed])
+            rows = self.conn.execute('''SELECT product_name, product_link, seen_at, removed_at FROM products
+                                        WHERE site = ? AND removed_at IS NOT NULL
+                                        ORDER BY removed_at, product_name''', (self.site_name,)).fetchall()
+
+        removed_path = os.path.join(output_dir, f'{self.site_name}_removed_products.csv')
+        if rows:
+            with open(removed_path, mode='w', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerow(['product_name', 'product_link', 'last_seen', 'removed_at'])
+                writer.writerows(rows)
+        elif os.path.exists(removed_path):
+            os.remove(removed_path)
+        return self.removed
+
+    def summary(self):
+        return {
+            'sitemap_urls': len(self.lastmods),
+            'skipped': self.skipped,
+            'removed': len(self.removed),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        if stats['sitemap_urls']:
+            print(f"Sitemap: {stats['skipped']} products unchanged since their lastmod, not fetched")
+        if stats['removed']:
+            print(f"{stats['removed']} products no longer listed, see {self.site_name}_removed_products.csv")
+
+    def close(self):
+        self.conn.close()
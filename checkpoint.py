@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+
+class CrawlCheckpoint:
+    """Append-only journal of the products a crawl has completely finished.
+
+    A product is only journalled once its CSV and every one of its assets are
+    on disk. The journal is created as soon as a crawl starts and removed when
+    it ends cleanly, so finding one at start-up means the previous run was
+    interrupted, even before any product was done, and should be resumed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = set()
+        self.resuming = os.path.exists(path)
+        if self.resuming:
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        self.done.add(json.loads(line)['product'])
+                    except (ValueError, KeyError):
+                        # Last line cut off by the crash
+                        continue
+        else:
+            open(path, 'w', encoding='utf-8').close()
+
+    def is_done(self, product_link):
+        return product_link in self.done
+
+    def mark_done(self, product_link):
+        with self.lock:
+            self.done.add(product_link)
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps({'product': product_link}) + '\n')
+
+    def track(self, product_link, futures, finished=None):
+        """Mark the product done once all of its download ``futures`` have succeeded.
+
+        ``finished(complete)`` is called once every future has finished, with
+        whether all of them succeeded.
+        """
+        if not futures:
+            self.mark_done(product_link)
+            if finished:
+                finished(True)
+            return
+
+        state = {'remaining': len(futures), 'failed': False}
+
+        def on_done(future):
+            with self.lock:
+                if future.cancelled() or future.exception() is not None or future.result() is None:
+                    state['failed'] = True
+                state['remaining'] -= 1
+                last = state['remaining'] == 0
+            if last and not state['failed']:
+                self.mark_done(product_link)
+            if last and finished:
+                finished(not state['failed'])
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
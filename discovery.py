@@ -0,0 +1,125 @@
+import gzip
+import html
+import json
+import re
+import xml.etree.ElementTree as ElementTree
+
+import http_client
+import metrics
+import retry
+
+# Dynamicweb sites (Fletco) describe each product for Google Analytics with a googleImpression object
+google_impression_pattern = re.compile(r'"googleImpression"\s*:\s*')
+
+# Sitemap indexes are followed this many levels down
+max_sitemap_depth = 2
+
+source_names = {
+    'feed': 'JSON feed',
+    'html': 'listing page HTML',
+}
+
+
+def google_impressions(text):
+    """Yield every ``googleImpression`` object in a JSON feed or a page, in document order."""
+    decoder = json.JSONDecoder()
+    text = html.unescape(text)
+    for match in google_impression_pattern.finditer(text):
+        try:
+            impression, _ = decoder.raw_decode(text, match.end())
+        except ValueError:
+            continue
+        if isinstance(impression, dict):
+            yield impression
+
+
+def parse_sitemap(content):
+    """Return ``(loc, lastmod)`` pairs of a sitemap, and the locations of the sitemaps an index lists."""
+    if content[:2] == b'\x1f\x8b':
+        # sitemap.xml.gz served without Content-Encoding
+        content = gzip.decompress(content)
+    urls = []
+    sitemaps = []
+    root = ElementTree.fromstring(content)
+    for entry in root:
+        # Tags carry the sitemap namespace, so match on the local name
+        fields = {child.tag.rsplit('}', 1)[-1]: (child.text or '').strip() for child in entry}
+        if not fields.get('loc'):
+            continue
+        if entry.tag.endswith('sitemap'):
+            sitemaps.append(fields['loc'])
+        else:
+            urls.append((fields['loc'], fields.get('lastmod')))
+    return urls, sitemaps
+
+
+def sitemap_entries(sitemap_url, depth=0):
+    """Return ``{url: lastmod}`` for every page of ``sitemap_url``, following sitemap indexes."""
+    response = http_client.get(sitemap_url)
+    if response.status_code != 200:
+        return {}
+    metrics.count('discovery_bytes', len(response.content), source='sitemap')
+    try:
+        urls, sitemaps = parse_sitemap(response.content)
+    except (ElementTree.ParseError, OSError, EOFError):
+        print(f"Sitemap {sitemap_url} could not be read")
+        return {}
+    entries = dict(urls)
+    if depth < max_sitemap_depth:
+        for nested_url in sitemaps:
+            entries.update(sitemap_entries(nested_url, depth + 1))
+    return entries
+
+
+def fetch_feed(site, keep=None):
+    response = http_client.get(site.listing_url, params=site.feed_params)
+    if response.status_code != 200:
+        return []
+    metrics.count('discovery_bytes', len(response.content), source='feed')
+    if keep:
+        keep('feed', site.listing_url, response.content)
+    return site.parse_feed(response)
+
+
+def fetch_listing_page(site, keep=None):
+    response = http_client.get(site.listing_url)
+    if keep and response.status_code == 200:
+        keep('listing', site.listing_url, response.content)
+    return response
+
+
+def discover(site, keep=None):
+    """List the products of ``site``, from the cheapest source that has them.
+
+    The sources in ``site.discovery`` are tried in order: a JSON feed of the
+    listing (``feed``), which needs no HTML parsing at all, and the listing
+    page's HTML (``html``). The HTML is parsed when ``html`` comes up or when
+    no other source lists any product. ``keep(kind, url, content)`` is given
+    the feed and listing pages read.
+    """
+    for source in site.discovery:
+        if source not in source_names:
+            raise ValueError(f"Unknown discovery source: {source}")
+        if source == 'html':
+            break
+        try:
+            products = fetch_feed(site, keep)
+        except retry.network_errors as error:
+            # The HTML listing may still be reachable
+            print(f"Could not read the {source_names[source]}. {error}")
+            continue
+        if products:
+            return found(products, source)
+
+    listing = fetch_listing_page(site, keep)
+    if listing.status_code != 200:
+        print(f"Failed to retrieve the webpage. Status code: {listing.status_code}")
+        return []
+    metrics.count('discovery_bytes', len(listing.content), source='html')
+    return found(site.parse_listing(listing), 'html')
+
+
+def found(products, source):
+    metrics.count('discovered_products', len(products), source=source)
+    print(f"Found {len(products)} products in the {source_names[source]}")
+    return products
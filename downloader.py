@@ -0,0 +1,327 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import http_client
+import metrics
+import retry
+
+# Bytes read from the socket and written to disk at a time
+chunk_size = 64 * 1024
+
+
+def filename_from_response(response, default='file_1.pdf'):
+    # Extract the filename from the Content-Disposition header
+    content_disposition = response.headers.get("Content-Disposition")
+    if content_disposition:
+        filename_match = re.search(r'filename="(.+?)"', content_disposition)
+        if filename_match:
+            return filename_match.group(1)
+    return default
+
+
+def hash_part(part_path):
+    """Return the size and running SHA-256 of what an earlier attempt wrote to ``part_path``."""
+    written = 0
+    digest = hashlib.sha256()
+    with open(part_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+            written += len(chunk)
+    return written, digest
+
+
+def stream_to_file(response, part_path, resume=False):
+    """Write a streamed response body to ``part_path``, appending to it with ``resume``.
+
+    Returns the size of the file and the SHA-256 of its whole content.
+
+    The body is written in ``chunk_size`` pieces so memory use does not grow
+    with the file size. Callers rename the finished part file into place, so an
+    interrupted download never leaves a truncated file under its final name and
+    can later be resumed from where it stopped.
+    """
+    written, digest = hash_part(part_path) if resume else (0, hashlib.sha256())
+    with open(part_path, 'ab' if resume else 'wb') as file:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            file.write(chunk)
+            digest.update(chunk)
+            written += len(chunk)
+    return written, digest.hexdigest()
+
+
+def range_validator(response):
+    # If-Range needs a strong ETag or a Last-Modified date
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
+
+
+class BaseDownloader:
+    """Bookkeeping shared by the thread-pool and the asyncio downloaders.
+
+    Subclasses only do the network part; this class decides what to ask for
+    (a manifest hit, a Range request or a conditional request) and what to do
+    with the answer, places finished files through the ``BlobStore`` and
+    records them in the cache and the manifest, and keeps the run's counters.
+    """
+
+    def __init__(self, cache=None, store=None, manifest=None):
+        self.cache = cache
+        self.store = store
+        self.manifest = manifest
+        self.skip_known = False
+        # First download of each URL this run, and the content hash it produced
+        self.url_futures = {}
+        self.url_hashes = {}
+        self.lock = threading.Lock()
+        self.futures = []
+        self.files = 0
+        self.bytes = 0
+        self.failed = 0
+        # Downloads that failed, as ``submit`` arguments, for one more try at the end of the run
+        self.retry_queue = []
+        self.replayed = 0
+        self.start_time = time.time()
+
+    def known_path(self, url, path, folder, once):
+        # Assets the manifest already has on disk are not fetched again
+        if (once or self.skip_known) and self.manifest:
+            found = self.manifest.find(url, path, folder)
+            if found:
+                known_path, content_hash = found
+                # Other paths queued for the URL are linked from this blob
+                self.url_hashes[url] = content_hash
+                return known_path
+        return None
+
+    def request_headers(self, url, path, folder):
+        """Return the part file for ``url``, the headers to request it with and the bytes already held."""
+        part_path = self._part_path(url, path, folder)
+        validator = self.manifest.partial_validator(url) if self.manifest else None
+        offset = os.path.getsize(part_path) if validator and os.path.exists(part_path) else 0
+        if offset:
+            # Ask for the rest of the file, or the whole file if it changed in between
+            headers = {'Range': f'bytes={offset}-', 'If-Range': validator}
+        else:
+            headers = self.cache.conditional_headers(url, path) if self.cache else {}
+        return part_path, headers, offset
+
+    def _part_path(self, url, path, folder):
+        # Stable per URL, so an interrupted download is found again by the next run
+        url_key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        if self.store:
+            directory = self.store.root
+        else:
+            directory = os.path.dirname(path) if path else folder
+        return os.path.join(directory, f".{url_key}.part")
+
+    def not_modified(self, url, path):
+        self.cache.record_hit(url)
+        entry = self.cache.lookup(url)
+        self.url_hashes[url] = entry['content_hash']
+        return path or entry['path']
+
+    def check_response(self, job, response, status, part_path):
+        """Settle a download whose response carries no file to write.
+
+        Returns ``(True, result)`` after a 304, with the file already on disk,
+        or after a failed status, with ``None``. Otherwise returns
+        ``(False, path)`` with the path the body is to be written to.
+        """
+        url, path, folder, label, once = job
+        if status == 304:
+            return True, self.not_modified(url, path)
+
+        if status == 416:
+            # The partial file doesn't match the resource any more, start over next time
+            os.remove(part_path)
+
+        if status not in (200, 206):
+            self.count_failure(job, f"Status code: {status}")
+            return True, None
+
+        if path is None:
+            path = os.path.join(folder, filename_from_response(response))
+        if self.manifest and status == 200:
+            self.manifest.start_partial(url, range_validator(response))
+        return False, path
+
+    def received(self, url, response, status, part_path, path, offset, size, content_hash):
+        """Place a body streamed to ``part_path``, of which only what follows ``offset`` was fetched on a 206."""
+        if self.manifest:
+            self.manifest.finish_partial(url)
+        return self.place(url, response, part_path, path, content_hash, size,
+                          size - offset if status == 206 else size)
+
+    def count_failure(self, job, reason):
+        # A download that fails even after retries waits in the retry queue instead of aborting the run
+        url, path, folder, label, once = job
+        print(f"Failed to download {label}. {reason}, URL: {url}")
+        with self.lock:
+            self.failed += 1
+            self.retry_queue.append(job)
+
+    def start_replay(self):
+        """Take the failed downloads off the retry queue so they can be submitted once more.
+
+        Hosts that were down or throttling may have recovered by the end of the run.
+        """
+        with self.lock:
+            jobs, self.retry_queue = self.retry_queue, []
+            self.failed -= len(jobs)
+            self.replayed += len(jobs)
+            for job in jobs:
+                # Let the URL be fetched again instead of linked from its failed first download
+                self.url_futures.pop(job[0], None)
+        if jobs:
+            print(f"Retrying {len(jobs)} failed downloads")
+        return jobs
+
+    def place(self, url, response, part_path, path, content_hash, size, transferred):
+        """Move a finished part file to ``path`` and record it; ``transferred`` is the bytes fetched this time."""
+        if self.store:
+            self.store.ingest(part_path, content_hash)
+            self.store.link(content_hash, path)
+        else:
+            os.replace(part_path, path)
+        self.url_hashes[url] = content_hash
+
+        if self.cache:
+            self.cache.record_miss()
+            self.cache.store(url, response, path, content_hash, size)
+        if self.manifest:
+            self.manifest.record(url, path, content_hash, size)
+        with self.lock:
+            self.files += 1
+            self.bytes += transferred
+        metrics.count('bytes', transferred, host=urlparse(url).netloc)
+        return path
+
+    def link_duplicate(self, url, first_path, path, folder, label='image', once=False):
+        # Link a URL queued for several paths from the blob its first download produced
+        if first_path is None:
+            self.count_failure((url, path, folder, label, once), "Download for another product failed")
+            return None
+        if path is None:
+            path = os.path.join(folder, os.path.basename(first_path))
+
+        content_hash = self.url_hashes.get(url)
+        if not self.store.has(content_hash):
+            self.count_failure((url, path, folder, label, once), "Stored copy of the first download is missing")
+            return None
+        self.store.link(content_hash, path)
+        if self.manifest:
+            self.manifest.record(url, path, content_hash, os.path.getsize(path))
+        return path
+
+    def summary(self):
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        megabytes = self.bytes / (1024 * 1024)
+        return {
+            'files': self.files,
+            'failed': self.failed,
+            'recovered': max(self.replayed - self.failed, 0),
+            'already_downloaded': self.manifest.skipped if self.manifest else 0,
+            'megabytes': round(megabytes, 2),
+            'seconds': round(elapsed, 2),
+            'files_per_second': round(self.files / elapsed, 2),
+            'megabytes_per_second': round(megabytes / elapsed, 2),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"Downloaded {stats['files']} files ({stats['megabytes']} MB) in {stats['seconds']}s: "
+              f"{stats['files_per_second']} files/s, {stats['megabytes_per_second']} MB/s, "
+              f"{stats['failed']} failed ({stats['recovered']} recovered on retry), "
+              f"{stats['already_downloaded']} already downloaded")
+
+
+class AssetDownloader(BaseDownloader):
+    """Download product assets on a bounded thread pool.
+
+    Every scraper queues its images, colour swatches and documents with
+    ``submit`` while it walks the catalogue, and calls ``wait`` at the end of
+    the run. No more than ``per_host`` downloads run against the same host at
+    once, so a large pool does not hammer a single site.
+
+    With an ``HttpCache`` an asset that is already on disk is revalidated with
+    a conditional request and skipped when the server answers 304. With a
+    ``BlobStore`` each file is kept once by content hash and linked into the
+    product folders, and a URL queued for several paths is only fetched once.
+    With a ``DownloadManifest`` assets submitted with ``once=True`` (or every
+    asset, when ``skip_known`` is set for a resumed crawl) are not fetched again
+    while the recorded file is still complete on disk, and a download cut off
+    half way is continued with an HTTP Range request on the next attempt.
+    """
+
+    def __init__(self, max_workers=8, per_host=4, cache=None, store=None, manifest=None):
+        super().__init__(cache=cache, store=store, manifest=manifest)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.per_host = per_host
+        self.host_slots = {}
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.Semaphore(self.per_host)
+            return self.host_slots[host]
+
+    def submit(self, url, path=None, folder=None, label='image', once=False):
+        """Queue ``url`` to be written to ``path``.
+
+        Pass ``folder`` instead of ``path`` when the file name is only known
+        from the response's Content-Disposition header.
+        """
+        with self.lock:
+            first = self.url_futures.get(url) if self.store else None
+            if first is None:
+                future = self.executor.submit(self._fetch, url, path, folder, label, once)
+                self.url_futures[url] = future
+            else:
+                future = self.executor.submit(self._link_duplicate, url, first, path, folder, label, once)
+            self.futures.append(future)
+        return future
+
+    def _link_duplicate(self, url, first, path, folder, label, once):
+        # Runs after the first download of ``url`` was picked up, so waiting on it can't deadlock
+        return self.link_duplicate(url, first.result(), path, folder, label, once)
+
+    def _fetch(self, url, path, folder, label, once=False):
+        try:
+            return self._download(url, path, folder, label, once)
+        except retry.network_errors as error:
+            self.count_failure((url, path, folder, label, once), error)
+            return None
+
+    def _download(self, url, path, folder, label, once=False):
+        known_path = self.known_path(url, path, folder, once)
+        if known_path:
+            return known_path
+
+        part_path, headers, offset = self.request_headers(url, path, folder)
+        with self._host_slot(url), http_client.get(url, stream=True, headers=headers) as response:
+            settled, path = self.check_response((url, path, folder, label, once), response, response.status_code,
+                                                part_path)
+            if settled:
+                return path
+            with metrics.timed('download', host=urlparse(url).netloc):
+                size, content_hash = stream_to_file(response, part_path, resume=response.status_code == 206)
+        return self.received(url, response, response.status_code, part_path, path, offset, size, content_hash)
+
+    def wait(self):
+        """Block until every queued download has finished, retry the failed ones once and return the run summary."""
+        try:
+            for future in self.futures:
+                future.result()
+            for future in [self.submit(*job) for job in self.start_replay()]:
+                future.result()
+        finally:
+            self.executor.shutdown(wait=True)
+        return self.summary()
@@ -0,0 +1,467 @@
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from tqdm import tqdm
+
+import http_client
+import metrics
+import rate_limit
+import retry
+from asset_store import BlobStore
+from catalogue import CatalogueWriter
+from changes import ChangeTracker
+from checkpoint import CrawlCheckpoint
+from discovery import discover, sitemap_entries
+from downloader import AssetDownloader
+from http_cache import HttpCache
+from manifest import DownloadManifest
+from parsing import make_soup
+from snapshots import SnapshotStore
+from thumbnails import ThumbnailStage, make_variants
+
+
+def asset(url, kind=None, filename=None, label='image', shared=None, once=False, **extra):
+    """Describe a file to download for a product.
+
+    ``kind`` is the product subfolder (``images``, ``doc_files`` or
+    ``available_colours``). ``shared`` instead names a folder directly under the
+    site's output directory, used by documents common to many products.
+    Without a ``filename`` the name is taken from the Content-Disposition header.
+    ``once`` assets are not fetched again while the download manifest has them.
+    """
+    return dict(url=url, kind=kind, filename=filename, label=label, shared=shared, once=once, **extra)
+
+
+class Site:
+    """One product catalogue: where its products are listed and how to read them.
+
+    Subclasses fill in the class attributes and implement ``parse_listing`` and
+    ``parse_product``; the fetching, caching, downloading and CSV writing is
+    done by ``run``.
+    """
+
+    name = None
+    base_url = None
+    listing_url = None
+    output_dir = None
+    # Product sources tried in order, the listing HTML last (see discovery.discover)
+    discovery = ('html',)
+    # Query turning listing_url into a JSON feed, read by parse_feed
+    feed_params = None
+    # Sitemap, whose lastmods let unchanged products be skipped
+    sitemap_url = None
+    # Product subfolders created for every product
+    asset_kinds = ('images', 'doc_files', 'available_colours')
+    # Strainers limiting parsing to the parts of the pages the extractor reads
+    listing_scope = None
+    product_scope = None
+
+    def absolute_url(self, link):
+        return self.base_url + link if self.base_url not in link else link
+
+    def parse_listing(self, response):
+        """Return ``{'product_name', 'product_link'}`` dicts for the listing page."""
+        raise NotImplementedError
+
+    def parse_feed(self, response):
+        """Like ``parse_listing``, for the JSON feed requested with ``feed_params``."""
+        raise NotImplementedError
+
+    def product_soup(self, content):
+        return make_soup(content, parse_only=self.product_scope)
+
+    def parse_product(self, soup, product):
+        """Add the product's details to ``product`` and return its assets."""
+        raise NotImplementedError
+
+    def expand_asset(self, shared_asset):
+        """Turn a shared asset into the files to download, by default the asset itself.
+
+        Returns ``None`` when the files can't be listed right now, e.g. their
+        page failed to load; the asset is then tried again at the end of the run.
+        """
+        return [shared_asset]
+
+    def product_folder(self, product_name):
+        # Replace spaces or slashes in names
+        return os.path.join(self.output_dir, product_name.replace(' ', '_').replace('/', '_'))
+
+
+def write_product_csv(csv_file_path, product):
+    with open(csv_file_path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=product.keys())
+        writer.writeheader()
+        writer.writerow(product)
+
+
+def extract_product(site, product, content):
+    """Parse a product page and return the filled-in ``product``, its assets and the time each step took.
+
+    Touches neither disk nor network, so it can run in a worker process; the
+    site, the product and the page are pickled over and the results back.
+    """
+    start = time.perf_counter()
+    soup = site.product_soup(content)
+    parsed = time.perf_counter()
+    assets = site.parse_product(soup, product)
+    timings = {'parse': parsed - start, 'extract': time.perf_counter() - parsed}
+    return product, assets, timings
+
+
+class Run:
+    """State of one crawl of a site: the cache, the download pool and the shared folders."""
+
+    def __init__(self, site, max_workers=8, per_host=4, dedup=True, output_format=None, parse_processes=0,
+                 thumbnails=False, snapshots=True):
+        self.site = site
+        # Product pages are parsed on worker processes while the next pages are fetched
+        self.parse_pool = ProcessPoolExecutor(max_workers=parse_processes) if parse_processes else None
+        self.parsing = deque()
+        self.max_parsing = 2 * parse_processes
+        self.cache = HttpCache()
+        self.store = BlobStore() if dedup else None
+        self.manifest = DownloadManifest()
+        # Sitemap lastmods of the products scraped before, and the products listed by earlier runs
+        self.changes = ChangeTracker(site.name)
+        # Compressed copies of the pages fetched, so the extractors can be rerun without the network
+        self.snapshots = SnapshotStore() if snapshots else None
+        # Every crawl learns the hosts' sustainable rates and health afresh, and has its own metrics
+        rate_limit.reset()
+        retry.reset()
+        metrics.reset()
+        self.downloader = self.make_downloader(max_workers, per_host)
+        # Shared documents already queued this run, so later products don't queue them again
+        self.claimed_urls = set()
+        # Products whose page couldn't be fetched, and shared assets whose files couldn't be listed,
+        # tried once more at the end of the run, when the hosts may have recovered
+        self.failed_products = []
+        self.failed_shared = []
+        # Folders of the products in this run's listing
+        self.product_folders = set()
+
+        # Products finished by an interrupted earlier run are skipped, and every asset already on disk is kept
+        os.makedirs(site.output_dir, exist_ok=True)
+        self.checkpoint = CrawlCheckpoint(os.path.join(site.output_dir, f'.{site.name}_checkpoint.jsonl'))
+        self.downloader.skip_known = self.checkpoint.resuming
+        if self.checkpoint.resuming:
+            print(f"Resuming interrupted crawl, {len(self.checkpoint.done)} products already done")
+
+        # Optional single-file catalogue of the whole run, next to the product folders
+        self.catalogue = None
+        if output_format:
+            catalogue_path = os.path.join(site.output_dir, f'{site.name}_catalogue.{output_format}')
+            self.catalogue = CatalogueWriter(catalogue_path, output_format)
+
+        # Optional resized WebP/AVIF variants of the pictures, made once the downloads are done
+        self.thumbnails = ThumbnailStage() if thumbnails else None
+
+    def make_downloader(self, max_workers, per_host):
+        return AssetDownloader(max_workers=max_workers, per_host=per_host,
+                               cache=self.cache, store=self.store, manifest=self.manifest)
+
+    def fetch_listing(self):
+        products = discover(self.site, keep=self.keep_page if self.snapshots else None)
+        lastmods = {}
+        if self.site.sitemap_url:
+            try:
+                lastmods = sitemap_entries(self.site.sitemap_url)
+            except retry.network_errors as error:
+                print(f"Could not read the sitemap, fetching every product. {error}")
+        self.changes.start(products, lastmods)
+        self.product_folders = {self.site.product_folder(product['product_name']) for product in products}
+        return products
+
+    def keep_page(self, kind, url, content, product_name=None):
+        self.snapshots.add(self.site.name, kind, url, content, product_name)
+
+    def unchanged_in_sitemap(self, product):
+        # A product whose sitemap lastmod hasn't moved since it was scraped is not requested at all
+        product_link = product['product_link']
+        if not (self.changes.unchanged(product_link, self.csv_path(product)) and self.skip_unchanged(product_link)):
+            return False
+        self.changes.skipped += 1
+        return True
+
+    def skip_product(self, product):
+        # Products finished by an interrupted earlier run, or unchanged in the sitemap, are not requested at all
+        product_link = product['product_link']
+        if self.checkpoint.is_done(product_link):
+            self.carry_over(product_link)
+            return True
+        return self.unchanged_in_sitemap(product)
+
+    def page_action(self, product_link, unchanged, status_code):
+        """Return whether to ``'skip'`` a revalidated product page, ``'refetch'`` its body or ``'parse'`` it."""
+        if not unchanged:
+            return 'parse'
+        if self.skip_unchanged(product_link):
+            return 'skip'
+        # The product has to be parsed after all, and a 304 has no body to parse
+        return 'refetch' if status_code == 304 else 'parse'
+
+    def accept_page(self, product, status_code, content):
+        """Return whether a fetched product page can be parsed, keeping a snapshot of it if so."""
+        if status_code != 200:
+            self.product_failed(product, f"Status code: {status_code}")
+            return False
+        if self.snapshots:
+            self.keep_page('product', product['product_link'], content, product['product_name'])
+        return True
+
+    def scrape_product(self, product):
+        if self.skip_product(product):
+            return
+
+        product_link = product['product_link']
+        try:
+            product_page = self.cache.get(product_link, self.csv_path(product))
+            action = self.page_action(product_link, product_page.unchanged, product_page.status_code)
+            if action == 'skip':
+                return
+            if action == 'refetch':
+                product_page = http_client.get(product_link)
+        except retry.network_errors as error:
+            self.product_failed(product, error)
+            return
+        if not self.accept_page(product, product_page.status_code, product_page.content):
+            return
+
+        if self.parse_pool is None:
+            self.save_extracted(extract_product(self.site, product, product_page.content))
+            return
+
+        # Products are saved in listing order, as soon as their page is parsed
+        self.parsing.append(self.parse_pool.submit(extract_product, self.site, product, product_page.content))
+        while self.parsing and (self.parsing[0].done() or len(self.parsing) > self.max_parsing):
+            self.save_extracted(self.parsing.popleft().result())
+
+    def save_parsed(self):
+        # Save the products still being parsed when the listing is exhausted
+        while self.parsing:
+            self.save_extracted(self.parsing.popleft().result())
+
+    def save_extracted(self, result):
+        product, assets, timings = result
+        for stage, seconds in timings.items():
+            metrics.observe(stage, seconds, site=self.site.name)
+        self.save_product(product, assets)
+
+    def product_failed(self, product, reason):
+        print(f"Failed to fetch product page. {reason}, URL: {product['product_link']}")
+        self.failed_products.append(product)
+
+    def retry_failed_products(self):
+        """Take the products whose page failed off the list, to be scraped once more."""
+        products, self.failed_products = self.failed_products, []
+        if products:
+            print(f"Retrying {len(products)} failed product pages")
+        return products
+
+    def retry_failed_shared(self):
+        """Take the shared assets whose files couldn't be listed off the list, to be listed once more."""
+        shared_assets, self.failed_shared = self.failed_shared, []
+        if shared_assets:
+            print(f"Retrying {len(shared_assets)} failed shared assets")
+        return shared_assets
+
+    def csv_path(self, product):
+        return os.path.join(self.site.product_folder(product['product_name']), 'product_data.csv')
+
+    def skip_unchanged(self, product_link):
+        # Skip products whose page hasn't changed since the last run. A resumed crawl can't trust
+        # that, as the interrupted run may have written the CSV before all the assets arrived
+        if not self.checkpoint.resuming and self.carry_over(product_link):
+            self.checkpoint.mark_done(product_link)
+            self.changes.record(product_link)
+            return True
+        return False
+
+    def save_product(self, product, assets):
+        product_link = product['product_link']
+        product_folder = self.site.product_folder(product['product_name'])
+
+        # Create product directory and its subdirectories for images and documents
+        for kind in self.site.asset_kinds:
+            os.makedirs(os.path.join(product_folder, kind), exist_ok=True)
+
+        futures = []
+        for product_asset in assets:
+            futures.extend(self.queue_asset(product_folder, product_asset))
+
+        # Remove items from dict and write the product details to a CSV file
+        product.pop('product_link')
+        with metrics.timed('write', site=self.site.name):
+            write_product_csv(os.path.join(product_folder, 'product_data.csv'), product)
+            if self.catalogue:
+                self.catalogue.write(self.site.name, product_link, product)
+        self.checkpoint.track(product_link, futures,
+                              lambda complete: self.product_finished(product_link, product['product_name'], complete))
+
+    def product_finished(self, product_link, product_name, complete):
+        # Runs once all the product's downloads are done. A product missing assets must not look
+        # unchanged next run, neither by its page nor by its sitemap lastmod, or they'd never be fetched again
+        self.changes.record(product_link, product_name, up_to_date=complete)
+        if not complete:
+            self.cache.forget(product_link)
+
+    def carry_over(self, product_link):
+        # Unchanged products can only be skipped if the catalogue still has their record
+        return self.catalogue is None or self.catalogue.carry_over(product_link)
+
+    def queue_asset(self, product_folder, product_asset):
+        if product_asset['shared'] is None:
+            folder = os.path.join(product_folder, product_asset['kind'])
+            return [self.submit(product_asset, folder)]
+
+        # Each shared document URL is queued once per run; the manifest skips the ones already on disk
+        if product_asset['url'] in self.claimed_urls:
+            return []
+        self.claimed_urls.add(product_asset['url'])
+        return self.queue_shared(product_asset, self.shared_files(product_asset))
+
+    def queue_shared(self, product_asset, files):
+        if files is None:
+            # A failed future, so the product isn't taken as complete
+            failed = Future()
+            failed.set_result(None)
+            return [failed]
+        shared_folder = os.path.join(self.site.output_dir, product_asset['shared'])
+        os.makedirs(shared_folder, exist_ok=True)
+        return [self.submit(file_asset, shared_folder) for file_asset in files]
+
+    def shared_files(self, product_asset):
+        return self.expand_shared(product_asset)
+
+    def expand_shared(self, product_asset):
+        # The files a shared asset stands for; listing them can take a request of its own (Bolon's guides)
+        files = self.site.expand_asset(product_asset)
+        if files is None:
+            self.failed_shared.append(product_asset)
+        return files
+
+    def submit(self, file_asset, folder):
+        if file_asset['filename']:
+            return self.downloader.submit(file_asset['url'], os.path.join(folder, file_asset['filename']),
+                                          label=file_asset['label'], once=file_asset['once'])
+        return self.downloader.submit(file_asset['url'], folder=folder, label=file_asset['label'],
+                                      once=file_asset['once'])
+
+    def finish(self, completed):
+        # Wait for the queued downloads to finish
+        try:
+            if self.parse_pool:
+                self.parse_pool.shutdown(wait=True, cancel_futures=not completed)
+            self.downloader.wait()
+            if completed:
+                if self.thumbnails:
+                    make_variants(self.thumbnails, self.manifest, self.site.output_dir, self.product_folders,
+                                  self.site.name)
+                if self.catalogue:
+                    self.catalogue.close()
+                self.checkpoint.clear()
+                self.changes.flag_removed(self.site.output_dir)
+        finally:
+            self.downloader.print_summary()
+            if self.store:
+                self.store.print_summary()
+            if self.thumbnails:
+                self.thumbnails.print_summary()
+            self.cache.print_summary()
+            self.changes.print_summary()
+            if self.snapshots:
+                self.snapshots.print_summary(self.site.name)
+            rate_limit.print_summary()
+            retry.print_summary()
+            if self.failed_products:
+                print(f"{len(self.failed_products)} product pages could not be fetched")
+            if self.failed_shared:
+                print(f"{len(self.failed_shared)} shared assets could not be listed")
+            metrics.print_summary()
+            metrics.emit(run=self.site.name)
+            self.cache.close()
+            self.manifest.close()
+            self.changes.close()
+            if self.snapshots:
+                self.snapshots.close()
+            http_client.close_sessions()
+
+
+def run(site, max_workers=8, per_host=4, dedup=True, output_format=None, parse_processes=0, thumbnails=False,
+        snapshots=True):
+    """Scrape every product of ``site`` into ``<output_dir>/<product name>/``.
+
+    With ``output_format`` (``jsonl``, ``csv`` or ``parquet``) all products are
+    also written to ``<output_dir>/<site>_catalogue.<format>``. With
+    ``parse_processes`` the product pages are parsed on that many worker
+    processes, so parsing runs on several cores while pages are fetched.
+    With ``thumbnails`` resized WebP/AVIF variants of every picture are made
+    after the downloads (see ``thumbnails.settings``; needs Pillow). Unless
+    ``snapshots`` is off, every page fetched is kept compressed for ``re_extract``.
+    """
+    crawl = Run(site, max_workers=max_workers, per_host=per_host, dedup=dedup, output_format=output_format,
+                parse_processes=parse_processes, thumbnails=thumbnails, snapshots=snapshots)
+    completed = False
+    try:
+        products = crawl.fetch_listing()
+        for product in tqdm(products, desc="Downloading Products", unit="product"):
+            crawl.scrape_product(product)
+        for product in crawl.retry_failed_products():
+            crawl.scrape_product(product)
+        crawl.save_parsed()
+        for product_asset in crawl.retry_failed_shared():
+            crawl.queue_shared(product_asset, crawl.expand_shared(product_asset))
+        completed = True
+    finally:
+        crawl.finish(completed)
+
+
+def re_extract(site, output_format=None):
+    """Run the extractor again over every product page in the snapshot store, without any network access.
+
+    Each product's CSV, and with ``output_format`` the catalogue, is written
+    again from the stored page, e.g. after fixing a broken selector. Assets are
+    not downloaded; the next crawl fetches any that the fixed extractor finds.
+    """
+    store = SnapshotStore()
+    metrics.reset()
+    catalogue = None
+    if output_format:
+        catalogue = CatalogueWriter(os.path.join(site.output_dir, f'{site.name}_catalogue.{output_format}'),
+                                    output_format)
+    pages = failed = assets_found = 0
+    start = time.perf_counter()
+    completed = False
+    try:
+        for product, content in store.pages(site.name, 'product'):
+            try:
+                product, assets, timings = extract_product(site, product, content)
+            except (AttributeError, IndexError, KeyError, TypeError) as error:
+                # What a selector that no longer matches the page raises
+                print(f"Failed to extract {product['product_link']}. {type(error).__name__}: {error}")
+                failed += 1
+                continue
+            for stage, seconds in timings.items():
+                metrics.observe(stage, seconds, site=site.name)
+            product_link = product.pop('product_link')
+            product_folder = site.product_folder(product['product_name'])
+            os.makedirs(product_folder, exist_ok=True)
+            with metrics.timed('write', site=site.name):
+                write_product_csv(os.path.join(product_folder, 'product_data.csv'), product)
+                if catalogue:
+                    catalogue.write(site.name, product_link, product)
+            pages += 1
+            assets_found += len(assets)
+        completed = True
+    finally:
+        if catalogue and completed:
+            catalogue.close()
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"Re-extracted {pages} pages in {elapsed:.2f}s ({pages / elapsed:.1f} pages/s), {failed} failed, "
+              f"{assets_found} assets referenced")
+        store.print_summary(site.name)
+        metrics.print_summary()
+        metrics.emit(run=site.name, mode='re-extract')
+        store.close()
@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Record every response into this archive, or send every request to this replay server instead of the site
+settings = {
+    'record_path': os.environ.get('SCRAPER_RECORD'),
+    'replay_url': os.environ.get('SCRAPER_REPLAY'),
+}
+
+# Response headers the scrapers look at. Bodies are stored decoded, so the transfer headers are dropped.
+kept_headers = ('Content-Type', 'Content-Disposition', 'ETag', 'Last-Modified')
+
+_archive = None
+_lock = threading.Lock()
+
+
+def archive_key(url):
+    """``host/path?query`` of ``url``; the scheme is left out so replays can be served over plain HTTP."""
+    parts = urlsplit(url)
+    key = f"{parts.netloc}{parts.path or '/'}"
+    return f"{key}?{parts.query}" if parts.query else key
+
+
+def replay_url(url):
+    """Where ``url`` is fetched from: the replay server when one is configured, otherwise ``url`` itself."""
+    if not settings['replay_url']:
+        return url
+    return f"{settings['replay_url'].rstrip('/')}/{archive_key(url)}"
+
+
+class HttpArchive:
+    """Recorded responses (status, the headers in ``kept_headers`` and body) keyed by ``archive_key``.
+
+    Recording the same URL again replaces the earlier response, so an archive
+    can be refreshed by recording another run into it.
+    """
+
+    def __init__(self, db_path='http_archive.db'):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                             key TEXT PRIMARY KEY,
+                             url TEXT,
+                             status INTEGER,
+                             headers TEXT,
+                             body BLOB,
+                             elapsed REAL,
+                             recorded_at TEXT)''')
+        self.conn.commit()
+
+    def record(self, url, status, headers, body, elapsed=None):
+        headers = {name: headers[name] for name in kept_headers if headers.get(name)}
+        with self.lock:
+            self.conn.execute('''INSERT OR REPLACE INTO responses
+                                 (key, url, status, headers, body, elapsed, recorded_at)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                              (archive_key(url), url, status, json.dumps(headers), body, elapsed,
+                               time.strftime('%Y-%m-%d %H:%M:%S')))
+            self.conn.commit()
+
+    def lookup(self, key):
+        """Return ``(status, headers, body)`` recorded under ``key``, or ``None``."""
+        with self.lock:
+            row = self.conn.execute('SELECT status, headers, body FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        status, headers, body = row
+        return status, json.loads(headers), body
+
+    def summary(self):
+        with self.lock:
+            responses, size = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) '
+                                                'FROM responses').fetchone()
+        return {'responses': responses, 'megabytes': round(size / (1024 * 1024), 2)}
+
+    def close(self):
+        self.conn.close()
+
+
+def recording():
+    return bool(settings['record_path'])
+
+
+def record(response):
+    """Add a ``requests`` response to the archive at ``settings['record_path']``.
+
+    Reading ``response.content`` keeps a streamed body in memory, and
+    ``iter_content`` then serves it from there, so downloads still work while
+    recording. 304 and 206 answers are skipped: they only make sense next to
+    an earlier run's files, so record from an empty working directory.
+    """
+    global _archive
+    if response.status_code in (206, 304):
+        return
+    with _lock:
+        if _archive is None:
+            _archive = HttpArchive(settings['record_path'])
+    url = response.history[0].url if response.history else response.url
+    _archive.record(url, response.status_code, response.headers, response.content,
+                    response.elapsed.total_seconds())
+
+
+def close():
+    global _archive
+    with _lock:
+        if _archive is not None:
+            _archive.close()
+            _archive = None
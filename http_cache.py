@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import http_client
+
+
+class HttpCache:
+    """Persistent ETag / Last-Modified / content hash store keyed by URL.
+
+    Each entry also remembers the local file that holds the result of the URL
+    (the downloaded asset, or the product's CSV for a product page). Validators
+    are only sent while that file still exists, so deleting an output folder
+    always forces a full refetch.
+    """
+
+    def __init__(self, db_path='http_cache.db'):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS http_cache (
+                             url TEXT PRIMARY KEY,
+                             etag TEXT,
+                             last_modified TEXT,
+                             content_hash TEXT,
+                             size INTEGER,
+                             path TEXT,
+                             fetched_at TEXT)''')
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.conn.execute('''SELECT etag, last_modified, content_hash, size, path
+                                       FROM http_cache WHERE url = ?''', (url,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('etag', 'last_modified', 'content_hash', 'size', 'path'), row))
+
+    def conditional_headers(self, url, path=None):
+        """Return If-None-Match / If-Modified-Since headers for ``url``, or ``{}``."""
+        entry = self.lookup(url)
+        if entry is None:
+            return {}
+        target = path or entry['path']
+        if not target or not os.path.exists(target):
+            return {}
+
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response, path, content_hash, size):
+        with self.lock:
+            self.conn.execute('''INSERT OR REPLACE INTO http_cache
+                                 (url, etag, last_modified, content_hash, size, path, fetched_at)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                              (url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                               content_hash, size, path, time.strftime('%Y-%m-%d %H:%M:%S')))
+            self.conn.commit()
+
+    def forget(self, url):
+        # Without an entry the next run neither revalidates nor trusts the page, it is parsed again
+        with self.lock:
+            self.conn.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+            self.conn.commit()
+
+    def record_hit(self, url, bytes_saved=None):
+        if bytes_saved is None:
+            entry = self.lookup(url)
+            bytes_saved = (entry['size'] or 0) if entry else 0
+        with self.lock:
+            self.hits += 1
+            self.bytes_saved += bytes_saved
+
+    def record_miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def get(self, url, path, **kwargs):
+        """Fetch a page, marking it ``unchanged`` when it matches the previous run.
+
+        A page is unchanged when the server answers 304, or when the body hashes
+        to the same value as last time and ``path`` still exists.
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(url, path))
+        response = http_client.get(url, headers=headers, **kwargs)
+        response.unchanged = self.check_page(url, path, response.status_code, response, response.content)
+        return response
+
+    def check_page(self, url, path, status, response, content):
+        """Record a page fetched with ``conditional_headers`` and return whether it is unchanged."""
+        if status == 304:
+            self.record_hit(url)
+            return True
+        if status != 200:
+            return False
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        entry = self.lookup(url)
+        unchanged = bool(entry and entry['content_hash'] == content_hash and os.path.exists(path))
+        if unchanged:
+            self.record_hit(url, bytes_saved=0)
+        else:
+            self.record_miss()
+        self.store(url, response, path, content_hash, len(content))
+        return unchanged
+
+    def summary(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'megabytes_saved': round(self.bytes_saved / (1024 * 1024), 2),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"Cache: {stats['hits']} unchanged, {stats['misses']} fetched, "
+              f"{stats['megabytes_saved']} MB not re-downloaded")
+
+    def close(self):
+        self.conn.close()
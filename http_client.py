@@ -0,0 +1,144 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import http_archive
+import metrics
+import rate_limit
+import retry
+
+# Connections kept open per host, and (connect, read) timeout in seconds
+settings = {
+    'pool_size': 10,
+    'timeout': (10, 60),
+}
+
+# Only advertise brotli when urllib3 is able to decode it
+try:
+    import brotli  # noqa: F401
+    accept_encoding = 'gzip, deflate, br'
+except ImportError:
+    accept_encoding = 'gzip, deflate'
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+class TimedConnection:
+    """Time every new connection to the host, TCP and (for HTTPS) TLS, as the ``connect`` stage.
+
+    Requests over a kept-alive connection don't connect, so comparing the
+    ``connect`` count with the ``responses`` count shows how often
+    connections are reused.
+    """
+
+    def connect(self):
+        host = self.host if self.port == self.default_port else f'{self.host}:{self.port}'
+        with metrics.timed('connect', host=host):
+            super().connect()
+
+
+class TimedHTTPConnection(TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                   'https': TimedHTTPSConnectionPool}
+
+
+def configure(pool_size=None, timeout=None):
+    """Change the pool size or default timeout used for sessions created from now on."""
+    if pool_size is not None:
+        settings['pool_size'] = pool_size
+    if timeout is not None:
+        settings['timeout'] = timeout
+
+
+def get_session(url):
+    """Return the persistent session for the host of ``url``, creating it on first use."""
+    parsed = urlparse(url)
+    host = f"{parsed.scheme}://{parsed.netloc}"
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = TimedAdapter(pool_connections=1, pool_maxsize=settings['pool_size'])
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({'Accept-Encoding': accept_encoding})
+            _sessions[host] = session
+        return session
+
+
+def get(url, **kwargs):
+    """Drop-in replacement for ``requests.get`` that reuses keep-alive connections.
+
+    Requests wait for their host's rate limiter, which learns from every
+    response how fast the host can be asked. Network errors and retryable
+    statuses are retried with jittered exponential backoff, and a host whose
+    circuit breaker is open fails at once with ``retry.CircuitOpenError``.
+
+    With ``http_archive`` configured, responses are recorded into the archive,
+    or the request goes to the local replay server instead of the site.
+    """
+    kwargs.setdefault('timeout', settings['timeout'])
+    host = urlparse(url).netloc
+    limiter = rate_limit.limiter_for(url)
+    breaker = retry.breaker_for(url)
+    attempt = 0
+    while True:
+        breaker.check()
+        with metrics.timed('rate_wait', host=host):
+            limiter.wait()
+        start = time.perf_counter()
+        try:
+            response = get_session(url).get(http_archive.replay_url(url), **kwargs)
+        except retry.network_errors as error:
+            metrics.count('errors', host=host, error=type(error).__name__)
+            delay = retry.next_delay(url, attempt, error=error)
+            if delay is None:
+                raise
+        else:
+            # Time to the response headers: connecting, TLS and the server's own latency
+            latency = time.perf_counter() - start
+            metrics.observe('fetch', latency, host=host)
+            metrics.count('responses', host=host, status=response.status_code)
+            if not kwargs.get('stream'):
+                metrics.count('bytes', len(response.content), host=host)
+            retry_after = response.headers.get('Retry-After')
+            limiter.observe(response.status_code, latency, retry_after)
+            delay = retry.next_delay(url, attempt, status=response.status_code, retry_after=retry_after)
+            if delay is None:
+                if http_archive.recording():
+                    http_archive.record(response)
+                return response
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def close_sessions():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
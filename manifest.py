@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class DownloadManifest:
+    """Persistent record of every file written, keyed by URL and target path.
+
+    ``find`` answers "do we already have this URL at this place?" with a
+    primary-key lookup and a stat of the file, so documents that never change
+    are not fetched again on the next run.
+    """
+
+    def __init__(self, db_path='download_manifest.db'):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS downloads (
+                                 url TEXT,
+                                 path TEXT,
+                                 content_hash TEXT,
+                                 size INTEGER,
+                                 downloaded_at TEXT,
+                                 PRIMARY KEY (url, path))''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_downloads_hash ON downloads (content_hash)')
+            # Downloads that were started but not finished, with the validator to resume them safely
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS partial_downloads (
+                                 url TEXT PRIMARY KEY,
+                                 validator TEXT)''')
+        self.skipped = 0
+
+    def find(self, url, path=None, folder=None):
+        """Return ``(path, content_hash)`` of the local file holding ``url`` if it is complete on disk, else ``None``.
+
+        Pass ``folder`` instead of ``path`` when the file name comes from the
+        response; any file recorded for ``url`` in that folder then matches.
+        """
+        with self.lock:
+            if path is not None:
+                rows = self.conn.execute('SELECT path, size, content_hash FROM downloads WHERE url = ? AND path = ?',
+                                         (url, path)).fetchall()
+            else:
+                rows = self.conn.execute('SELECT path, size, content_hash FROM downloads WHERE url = ?',
+                                         (url,)).fetchall()
+
+        for recorded_path, size, content_hash in rows:
+            if path is None and os.path.dirname(recorded_path) != folder:
+                continue
+            if os.path.exists(recorded_path) and os.path.getsize(recorded_path) == size:
+                with self.lock:
+                    self.skipped += 1
+                return recorded_path, content_hash
+        return None
+
+    def record(self, url, path, content_hash, size):
+        with self.lock, self.conn:
+            self.conn.execute('''INSERT OR REPLACE INTO downloads (url, path, content_hash, size, downloaded_at)
+                                 VALUES (?, ?, ?, ?, ?)''',
+                              (url, path, content_hash, size, time.strftime('%Y-%m-%d %H:%M:%S')))
+
+    def files_under(self, folder):
+        """Return ``(path, content_hash)`` of every recorded file below ``folder`` that is still on disk."""
+        prefix = os.path.join(folder, '')
+        with self.lock:
+            rows = self.conn.execute('SELECT path, content_hash FROM downloads').fetchall()
+        return [(path, content_hash) for path, content_hash in rows
+                if path.startswith(prefix) and content_hash and os.path.exists(path)]
+
+    def start_partial(self, url, validator):
+        with self.lock, self.conn:
+            if validator:
+                self.conn.execute('INSERT OR REPLACE INTO partial_downloads (url, validator) VALUES (?, ?)',
+                                  (url, validator))
+            else:
+                # Without a validator a resumed file could mix two versions, so it is never resumed
+                self.conn.execute('DELETE FROM partial_downloads WHERE url = ?', (url,))
+
+    def partial_validator(self, url):
+        with self.lock:
+            row = self.conn.execute('SELECT validator FROM partial_downloads WHERE url = ?', (url,)).fetchone()
+        return row[0] if row else None
+
+    def finish_partial(self, url):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM partial_downloads WHERE url = ?', (url,))
+
+    def close(self):
+        self.conn.close()
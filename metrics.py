@@ -0,0 +1,173 @@
+import contextlib
+import json
+import math
+import os
+import random
+import threading
+import time
+
+# Where each run's metrics go: appended JSON lines, and optionally a Prometheus textfile
+settings = {
+    'jsonl_path': os.environ.get('SCRAPER_METRICS', 'metrics.jsonl'),
+    'prometheus_path': os.environ.get('SCRAPER_PROMETHEUS_FILE'),
+}
+
+# Timings kept per histogram for the percentiles; past this a uniform sample is kept
+max_samples = 10000
+
+quantiles = (0.5, 0.95, 0.99)
+
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def percentile(ordered, q):
+    # Nearest-rank percentile of already sorted values
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+class Histogram:
+    """Count, sum, maximum and a bounded sample of one timing, for percentiles."""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if len(self.samples) < max_samples:
+            self.samples.append(value)
+        else:
+            # Reservoir sampling keeps every timing equally likely to be in the sample
+            index = random.randrange(self.count)
+            if index < max_samples:
+                self.samples[index] = value
+
+    def quantile(self, q):
+        return percentile(sorted(self.samples), q)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+def observe(name, seconds, **labels):
+    """Record one timing of stage ``name``, e.g. ``observe('fetch', 0.2, host='www.lano.com')``."""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.add(seconds)
+
+
+@contextlib.contextmanager
+def timed(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def count(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def snapshot():
+    """Return every timing and counter recorded since the last ``reset`` as JSON-ready records."""
+    records = []
+    with _lock:
+        for (name, labels), histogram in sorted(_histograms.items()):
+            record = {'metric': f'{name}_seconds', 'labels': dict(labels), 'count': histogram.count,
+                      'sum': round(histogram.sum, 6), 'max': round(histogram.max, 6)}
+            for q in quantiles:
+                record[f'p{round(q * 100)}'] = round(histogram.quantile(q), 6)
+            records.append(record)
+        for (name, labels), value in sorted(_counters.items()):
+            records.append({'metric': name, 'labels': dict(labels), 'value': value})
+    return records
+
+
+def write_jsonl(path, **run_labels):
+    # One line per timing or counter, tagged with the run they belong to
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    with open(path, 'a', encoding='utf-8') as file:
+        for record in snapshot():
+            file.write(json.dumps({'time': timestamp, **run_labels, **record}) + '\n')
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def write_prometheus(path, **run_labels):
+    """Write the metrics in the Prometheus text format, for node_exporter's textfile collector."""
+    lines = []
+    typed = set()
+    for record in snapshot():
+        name = f"scraper_{record['metric']}"
+        labels = {**run_labels, **record['labels']}
+        if 'value' in record:
+            if name not in typed:
+                lines.append(f'# TYPE {name}_total counter')
+                typed.add(name)
+            lines.append(f"{name}_total{_prometheus_labels(labels)} {record['value']}")
+            continue
+        if name not in typed:
+            lines.append(f'# TYPE {name} summary')
+            typed.add(name)
+        for q in quantiles:
+            quantile_labels = {**labels, 'quantile': q}
+            lines.append(f"{name}{_prometheus_labels(quantile_labels)} {record[f'p{round(q * 100)}']}")
+        lines.append(f"{name}_sum{_prometheus_labels(labels)} {record['sum']}")
+        lines.append(f"{name}_count{_prometheus_labels(labels)} {record['count']}")
+
+    # Written aside and renamed, so the collector never reads half a file
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, path)
+
+
+def emit(**run_labels):
+    """Write this run's metrics to the configured JSON lines file and Prometheus textfile."""
+    if settings['jsonl_path']:
+        write_jsonl(settings['jsonl_path'], **run_labels)
+    if settings['prometheus_path']:
+        write_prometheus(settings['prometheus_path'], **run_labels)
+
+
+def print_summary():
+    # Every stage across all hosts, so a slow run shows where its time went
+    stages = {}
+    with _lock:
+        for (name, labels), histogram in _histograms.items():
+            stage = stages.setdefault(name, {'count': 0, 'sum': 0.0, 'samples': []})
+            stage['count'] += histogram.count
+            stage['sum'] += histogram.sum
+            stage['samples'].extend(histogram.samples)
+    for name, stage in sorted(stages.items()):
+        ordered = sorted(stage['samples'])
+        print(f"Stage {name}: {stage['count']} x, p50 {percentile(ordered, 0.5) * 1000:.1f} ms, "
+              f"p95 {percentile(ordered, 0.95) * 1000:.1f} ms, p99 {percentile(ordered, 0.99) * 1000:.1f} ms, "
+              f"total {stage['sum']:.2f}s")
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
@@ -0,0 +1,47 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Parser backends, fastest first; html.parser ships with Python and is always available
+backends = ['lxml', 'html.parser']
+
+
+def available_backends():
+    found = []
+    for name in backends:
+        if name == 'html.parser':
+            found.append(name)
+            continue
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+# html.parser is the default: lxml is faster but repairs broken markup differently, so a site's
+# extracted output can change (see tests/test_parsing_backends.py). SCRAPER_PARSER picks another backend
+settings = {
+    'parser': os.environ.get('SCRAPER_PARSER') or 'html.parser',
+}
+
+
+def set_parser(name):
+    settings['parser'] = name
+
+
+def make_soup(markup, parser=None, parse_only=None):
+    """Parse ``markup`` with the configured backend, or ``parser`` if given.
+
+    ``parse_only`` is a ``SoupStrainer`` (see ``only``) limiting the tree to the
+    subtrees an extractor actually reads, which cuts parse time and memory.
+    """
+    return BeautifulSoup(markup, parser or settings['parser'], parse_only=parse_only)
+
+
+def only(name, class_=None):
+    """Strainer keeping just the ``name`` tags (with class ``class_``) and everything inside them."""
+    if class_ is None:
+        return SoupStrainer(name)
+    return SoupStrainer(name, class_=class_)
@@ -0,0 +1,64 @@
+import cProfile
+import os
+import pstats
+
+# BeautifulSoup calls the extractors lean on; their share of the run is reported on its own
+soup_hot_paths = ('find', 'find_all', '_find_all', 'get_text', 'select', 'select_one')
+
+# Rows shown in each section of the report
+top = 15
+
+repo_root = os.path.dirname(os.path.abspath(__file__))
+
+
+def is_soup_call(filename, function):
+    return f'{os.sep}bs4{os.sep}' in filename and function in soup_hot_paths
+
+
+def is_extractor_call(filename):
+    # Our own code: the scrapers, the site extractors and the engine, but not this module
+    return filename.startswith(repo_root) and os.path.basename(filename) != 'profiling.py'
+
+
+def function_name(filename, line, function):
+    location = os.path.relpath(filename, repo_root) if is_extractor_call(filename) else os.path.basename(filename)
+    return f"{location}:{line}({function})"
+
+
+def report(stats):
+    """Print the hottest functions overall, in BeautifulSoup's search API and in our own code."""
+    total = max(stats.total_tt, 1e-9)
+    soup_rows = []
+    extractor_rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        row = (cumulative, own, calls, function_name(filename, line, function))
+        if is_soup_call(filename, function):
+            soup_rows.append(row)
+        elif is_extractor_call(filename):
+            extractor_rows.append(row)
+
+    print(f"Profiled {total:.2f}s of CPU time")
+    stats.sort_stats('cumulative').print_stats(top)
+    for title, rows in (("BeautifulSoup search and text", soup_rows), ("Extractors and engine", extractor_rows)):
+        print(f"{title}:")
+        print(f"{'cumulative s':>13} {'own s':>8} {'% run':>6} {'calls':>9}  function")
+        for cumulative, own, calls, name in sorted(rows, reverse=True)[:top]:
+            print(f"{cumulative:>13.3f} {own:>8.3f} {cumulative * 100 / total:>6.1f} {calls:>9}  {name}")
+        print()
+
+
+def profile(func, *args, stats_path='profile.pstats', **kwargs):
+    """Run ``func`` under cProfile, save the stats to ``stats_path`` and print the report.
+
+    The saved stats can be compared across versions with ``python -m pstats``
+    or snakeviz. Only the calling thread is profiled, so crawls should parse
+    in that thread rather than on a worker pool.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(stats_path)
+        report(pstats.Stats(profiler))
+        print(f"Profile saved to {stats_path}")
+
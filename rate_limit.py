@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Requests per second each host starts at, and the bounds the adaptive rate stays within.
+# ``burst`` requests may go out back to back after a quiet spell.
+settings = {
+    'rate': 10.0,
+    'min_rate': 0.5,
+    'max_rate': 100.0,
+    'burst': 10,
+    # Requests per second added after every response that came back quickly
+    'increase': 0.2,
+    # Factor the rate is cut by on a 429/503, and on responses much slower than usual
+    'backoff': 0.5,
+    'slowdown': 0.9,
+    # Seconds after a cut before the rate is cut again, so one burst of 429s only counts once
+    'cut_interval': 1.0,
+    # Smoothed latency above this multiple of the best seen counts as the host slowing down
+    'slow_factor': 2.0,
+    # Longest Retry-After honoured, in seconds
+    'max_pause': 300,
+}
+
+# Statuses a host uses to say it's overloaded or we're going too fast
+throttle_statuses = (429, 503)
+
+# Latencies below this are all fast; scheduling noise alone would otherwise look like a slowdown
+fast_latency = 0.05
+
+# Longest a waiting request sleeps before checking the bucket again, as the rate may have risen
+max_sleep = 0.5
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+def configure(**options):
+    """Change the limiter settings for hosts seen from now on."""
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown rate limit settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+
+
+def retry_after_seconds(value):
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """Token bucket for one host whose rate follows how the host responds.
+
+    Every response that arrives at about the usual latency raises the rate by
+    ``increase``; a 429 or 503 halves it and honours ``Retry-After``, and a
+    host answering much slower than its best shrinks it a little. Requests
+    waiting for a token make up the host's queue.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.lock = threading.Lock()
+        self.rate = settings['rate']
+        self.tokens = settings['burst']
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_cut = 0.0
+        self.latency = None
+        self.best_latency = None
+        self.waiting = 0
+        self.max_waiting = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def _refill(self, now):
+        # No tokens are earned while a Retry-After pause is running
+        start = max(self.updated, self.paused_until)
+        if now > start:
+            self.tokens = min(settings['burst'], self.tokens + (now - start) * self.rate)
+        self.updated = max(now, self.updated)
+
+    def _take(self):
+        """Take a token and return 0, or return how long until one is due."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def _queue(self, change):
+        with self.lock:
+            self.waiting += change
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def wait(self):
+        delay = self._take()
+        if not delay:
+            return
+        self._queue(1)
+        try:
+            while delay:
+                time.sleep(min(delay, max_sleep))
+                delay = self._take()
+        finally:
+            self._queue(-1)
+
+    async def wait_async(self):
+        delay = self._take()
+        if not delay:
+            return
+        self._queue(1)
+        try:
+            while delay:
+                await asyncio.sleep(min(delay, max_sleep))
+                delay = self._take()
+        finally:
+            self._queue(-1)
+
+    def _cut(self, now, factor):
+        if now - self.last_cut >= settings['cut_interval']:
+            self.rate = max(settings['min_rate'], self.rate * factor)
+            self.last_cut = now
+
+    def observe(self, status, latency, retry_after=None):
+        """Adjust the rate after a response with ``status`` that took ``latency`` seconds."""
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            if status in throttle_statuses:
+                self.throttled += 1
+                self._cut(now, settings['backoff'])
+                pause = retry_after_seconds(retry_after)
+                if pause:
+                    self.paused_until = max(self.paused_until, now + min(pause, settings['max_pause']))
+                return
+
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            self.best_latency = self.latency if self.best_latency is None else min(self.best_latency, self.latency)
+            if self.latency > settings['slow_factor'] * max(self.best_latency, fast_latency):
+                self._cut(now, settings['slowdown'])
+            else:
+                self.rate = min(settings['max_rate'], self.rate + settings['increase'])
+
+    def summary(self):
+        with self.lock:
+            return {
+                'rate': round(self.rate, 2),
+                'queued': self.waiting,
+                'max_queued': self.max_waiting,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+            }
+
+
+def limiter_for(url):
+    """Return the limiter of the host of ``url``, creating it on first use."""
+    host = urlparse(url).netloc
+    with _lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(host)
+        return limiter
+
+
+def summary():
+    with _lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.summary() for limiter in limiters}
+
+
+def print_summary():
+    for host, stats in summary().items():
+        print(f"Rate {host}: {stats['rate']} requests/s, {stats['requests']} requests, "
+              f"{stats['throttled']} throttled, queue {stats['queued']} (peak {stats['max_queued']})")
+
+
+def reset():
+    # Forget what was learned about every host
+    with _lock:
+        _limiters.clear()
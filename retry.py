@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import rate_limit
+
+# Attempts per request (the first try included), and the backoff range in seconds
+settings = {
+    'attempts': 4,
+    'base_delay': 0.5,
+    'max_delay': 30.0,
+    # Consecutive failures that open a host's circuit, and how long it then stays open
+    'failure_threshold': 5,
+    'open_seconds': 30.0,
+}
+
+# Statuses worth asking again for: timeouts, throttling and server-side failures
+retryable_statuses = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Exceptions of the synchronous fetch path worth trying again
+network_errors = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stops requests to a host after ``failure_threshold`` failures in a row.
+
+    While open every request fails at once with ``CircuitOpenError``. After
+    ``open_seconds`` one request is let through: if it succeeds the circuit
+    closes, otherwise it stays open for another period.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.times_opened = 0
+
+    def check(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at >= settings['open_seconds'] and not self.trial_running:
+                # Half open: this request finds out whether the host is back
+                self.trial_running = True
+                return
+        raise CircuitOpenError(f"Circuit open for {self.host} after {self.failures} failures")
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= settings['failure_threshold']):
+                if self.opened_at is None:
+                    self.times_opened += 1
+                self.opened_at = time.monotonic()
+                self.trial_running = False
+
+
+_breakers = {}
+_lock = threading.Lock()
+stats = {'retries': 0, 'gave_up': 0}
+
+
+def configure(**options):
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown retry settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+
+
+def breaker_for(url):
+    """Return the circuit breaker of the host of ``url``, creating it on first use."""
+    host = urlparse(url).netloc
+    with _lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def backoff_delay(attempt, retry_after=None):
+    # Full jitter: anywhere up to the exponential cap, so clients that failed together retry apart
+    delay = random.uniform(0, min(settings['max_delay'], settings['base_delay'] * 2 ** attempt))
+    server_delay = rate_limit.retry_after_seconds(retry_after)
+    if server_delay is not None:
+        delay = max(delay, min(server_delay, settings['max_delay']))
+    return delay
+
+
+def next_delay(url, attempt, status=None, error=None, retry_after=None):
+    """Record how attempt number ``attempt`` went and return the seconds to wait before the next one.
+
+    Returns ``None`` when the response should be kept as it is, or the error
+    raised: it succeeded, its status isn't retryable, the attempts are used up
+    or the host's circuit has opened.
+    """
+    breaker = breaker_for(url)
+    if error is None and status not in retryable_statuses:
+        breaker.record_success()
+        return None
+
+    breaker.record_failure()
+    with _lock:
+        if attempt + 1 >= settings['attempts'] or breaker.is_open:
+            stats['gave_up'] += 1
+            return None
+        stats['retries'] += 1
+    return backoff_delay(attempt, retry_after)
+
+
+def summary():
+    with _lock:
+        breakers = list(_breakers.values())
+        totals = dict(stats)
+    totals['circuits_opened'] = sum(breaker.times_opened for breaker in breakers)
+    totals['open_hosts'] = [breaker.host for breaker in breakers if breaker.is_open]
+    return totals
+
+
+def print_summary():
+    totals = summary()
+    message = (f"Retries: {totals['retries']} retried, {totals['gave_up']} given up, "
+               f"{totals['circuits_opened']} circuits opened")
+    if totals['open_hosts']:
+        message += f" (still open: {', '.join(totals['open_hosts'])})"
+    print(message)
+
+
+def reset():
+    with _lock:
+        _breakers.clear()
+        stats.update(retries=0, gave_up=0)
@@ -0,0 +1,102 @@
+import argparse
+import os
+
+import http_archive
+import metrics
+import profiling
+import rate_limit
+from async_engine import run_async
+from catalogue import formats
+from engine import extract_product, re_extract, run
+from sites import SITES
+
+
+def extract_fixtures(site, paths, rounds=1):
+    """Run the site's extractor over saved product pages, without any network access."""
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as file:
+            pages.append((path, file.read()))
+
+    for _ in range(rounds):
+        for path, page in pages:
+            product_name = os.path.splitext(os.path.basename(path))[0]
+            extract_product(site, {'product_name': product_name, 'product_link': path}, page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape a product catalogue into <site>_products/ folders.')
+    parser.add_argument('site', choices=sorted(SITES), help='catalogue to scrape')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent asset downloads')
+    parser.add_argument('--per-host', type=int, default=4, help='concurrent downloads against one host')
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='write plain files instead of linking them from the shared asset store')
+    parser.add_argument('--output', choices=formats,
+                        help='also write every product of the run to one catalogue file in this format')
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                        help='fetch pages and assets from one asyncio event loop (needs aiohttp)')
+    parser.add_argument('--connections', type=int, default=100,
+                        help='open connections in total with --async')
+    parser.add_argument('--parse-processes', type=int, default=0,
+                        help='parse product pages on this many worker processes')
+    parser.add_argument('--thumbnails', action='store_true',
+                        help='also write resized WebP/AVIF variants of every picture (needs Pillow)')
+    parser.add_argument('--no-snapshots', action='store_true',
+                        help="don't keep compressed copies of the fetched pages for --re-extract")
+    parser.add_argument('--re-extract', action='store_true',
+                        help='rerun the extractor over the pages kept by earlier crawls, without the network')
+    parser.add_argument('--rate', type=float, default=rate_limit.settings['rate'],
+                        help='requests per second each host starts at; adapts to how the host responds')
+    parser.add_argument('--max-rate', type=float, default=rate_limit.settings['max_rate'],
+                        help='requests per second no host is ever asked faster than')
+    parser.add_argument('--metrics', default=metrics.settings['jsonl_path'],
+                        help='append the per-stage timings and per-host counters of the run to this JSON lines file')
+    parser.add_argument('--prometheus', default=metrics.settings['prometheus_path'],
+                        help='also write the metrics to this Prometheus textfile')
+    parser.add_argument('--profile', nargs='?', const='profile.pstats', metavar='STATS_FILE',
+                        help='run under cProfile, save the stats and report the hottest extraction code')
+    parser.add_argument('--fixtures', nargs='+', metavar='PAGE',
+                        help='with --profile, extract these saved product pages offline instead of crawling')
+    parser.add_argument('--rounds', type=int, default=10, help='times each fixture page is extracted')
+    parser.add_argument('--record', default=http_archive.settings['record_path'], metavar='ARCHIVE',
+                        help='save every response of the run into this archive, for replaying offline')
+    parser.add_argument('--replay', default=http_archive.settings['replay_url'], metavar='URL',
+                        help='fetch everything from this replay server (benchmarks/replay_server.py)')
+    args = parser.parse_args()
+
+    if args.fixtures and not args.profile:
+        parser.error('--fixtures needs --profile')
+    if args.profile and (args.async_mode or args.parse_processes):
+        # cProfile only sees the calling thread, so the pages have to be parsed there
+        parser.error('--profile parses in the crawl thread; drop --async and --parse-processes')
+    if args.record and (args.async_mode or args.replay):
+        # Recording reads each body into memory before the crawl streams it, which only the sync client allows
+        parser.error('--record works with the threaded crawl from the live site; drop --async and --replay')
+
+    rate_limit.configure(rate=args.rate, max_rate=args.max_rate)
+    metrics.settings.update(jsonl_path=args.metrics, prometheus_path=args.prometheus)
+    http_archive.settings.update(record_path=args.record, replay_url=args.replay)
+    site = SITES[args.site]
+    if args.re_extract:
+        if args.profile:
+            profiling.profile(re_extract, site, output_format=args.output, stats_path=args.profile)
+        else:
+            re_extract(site, output_format=args.output)
+    elif args.fixtures:
+        profiling.profile(extract_fixtures, site, args.fixtures, rounds=args.rounds, stats_path=args.profile)
+    elif args.profile:
+        profiling.profile(run, site, max_workers=args.workers, per_host=args.per_host, dedup=not args.no_dedup,
+                          output_format=args.output, thumbnails=args.thumbnails, snapshots=not args.no_snapshots,
+                          stats_path=args.profile)
+    elif args.async_mode:
+        run_async(site, max_connections=args.connections, per_host=args.per_host,
+                  dedup=not args.no_dedup, output_format=args.output, parse_processes=args.parse_processes,
+                  thumbnails=args.thumbnails, snapshots=not args.no_snapshots)
+    else:
+        run(site, max_workers=args.workers, per_host=args.per_host, dedup=not args.no_dedup,
+            output_format=args.output, parse_processes=args.parse_processes, thumbnails=args.thumbnails,
+            snapshots=not args.no_snapshots)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from sites.bolon import BolonSite
+from sites.fletcocarpets import FletcoCarpetsSite
+from sites.lano import LanoSite, LanoSmartstrandSite
+from sites.tapibel import TapibelSite
+
+# Every catalogue the engine can scrape, by the name used on the command line
+SITES = {site.name: site for site in (
+    BolonSite(),
+    FletcoCarpetsSite(),
+    LanoSite(),
+    LanoSmartstrandSite(),
+    TapibelSite(),
+)}
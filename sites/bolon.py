@@ -0,0 +1,161 @@
+import http_client
+import retry
+from engine import Site, asset
+from parsing import make_soup, only
+
+# Documents common to many products, kept in shared folders under products/
+shared_doc_folders = {
+    'Installation Guide': 'Installation_Guide',
+    'Cleaning Guide': 'Cleaning_Guide',
+    'Product Specification': 'Product_Specification',
+    'Declaration of Performance': 'Declaration_of_Performance',
+    'Light Reflectance Value': 'Light_Reflectance_Value',
+}
+
+# Documents downloaded into each product's doc_files folder
+product_doc_types = ('Texture', 'High resolution images (.zip)')
+
+
+def product_type(block, desc):
+    # Read the header/value rows of a product type table
+    details = {}
+    for row in block.find_all('tr'):
+        header = row.find('td', class_='product-types__info__item__table__header').get_text(strip=True)
+        value = row.find('td', class_='product-types__info__item__table__value').get_text(strip=True)
+        details['desc'] = desc
+        details[header] = value
+    return details
+
+
+class BolonSite(Site):
+    name = 'bolon'
+    base_url = 'https://www.bolon.com'
+    listing_url = 'https://www.bolon.com/en/products/floors'
+    sitemap_url = 'https://www.bolon.com/sitemap.xml'
+    output_dir = 'products'
+    asset_kinds = ('images', 'doc_files')
+    # The slideshow, the product types and the documents are all <section>s of a product page
+    listing_scope = only('ul', 'product-list columns')
+    product_scope = only('section')
+
+    def parse_listing(self, response):
+        soup = make_soup(response.content, parse_only=self.listing_scope)
+
+        # Extract the list of products
+        product_list = soup.find('ul', class_='product-list columns')
+
+        products = list()
+        for product in product_list.find_all('li', class_='product-list__item'):
+            product_link = product.find('a')['href']
+            product_name = product.find('h4', class_='product-list__item-title').get_text(strip=True)
+            products.append({'product_name': product_name, 'product_link': self.absolute_url(product_link)})
+        return products
+
+    def product_soup(self, content):
+        soup = make_soup(content, parse_only=self.product_scope)
+        if soup.find('div', class_='row show-for-medium-up') is None or soup.find('div', class_='row baseline-offset--1') is None:
+            # Layout moved the description or product types out of the sections, parse the whole page
+            soup = make_soup(content)
+        return soup
+
+    def parse_product(self, soup, product):
+        assets = []
+
+        # Extract description
+        desc_div = soup.find('div', class_='row show-for-medium-up')
+        desc = desc_div.find('p', class_='paragraphed-gen5').get_text(strip=True)
+        product.update({'desc': desc})
+
+        # Extract available types
+        available_in_div = soup.find('div', class_='row baseline-offset--1')
+        avin = available_in_div.find_all('div', class_='small-12 columns')
+
+        av_rolls = avin[1].find('div', id='b-rolls')
+        if av_rolls:
+            product.update({'Rolls': product_type(av_rolls, av_rolls.find('p').get_text(strip=True))})
+
+        av_tiles = avin[1].find('div', id='b-tiles')
+        if av_tiles:
+            product.update({'Tiles': product_type(av_tiles, av_tiles.find('p').get_text(strip=True))})
+
+        av_acoustictiles = avin[1].find('div', id='b-acoustictiles')
+        if av_acoustictiles:
+            desc = av_acoustictiles.find('p').get_text(strip=True)
+
+            # Join the list item texts with a comma and space
+            list_items = av_acoustictiles.find('ul').find_all('li')
+            desc += ', '.join(item.get_text(strip=True) for item in list_items)
+            product.update({'Acoustictiles': product_type(av_acoustictiles, desc)})
+
+        av_studio = avin[1].find('div', id='b-studio')
+        if av_studio:
+            p_elements = av_studio.find_all('p', class_="paragraphed-gen5")
+            desc = p_elements[0].get_text(strip=True)
+            desc += ', '.join([p.get_text(strip=True) for p in p_elements[1:]])
+            product.update({'Studio': {'desc': desc}})
+
+        # Image download
+        images = soup.find('section', class_='product-slideshow')
+        ul = images.find('ul', class_='product-slideshow__thumbs small-block-grid-2')
+        for image in ul.find_all('img'):
+            image_url = image['src']
+
+            # Extract the portion of the URL after 'cover-'
+            image_name = image_url.split('cover-')[-1] if 'cover-' in image_url else image_url.split('contain-')[-1]
+            image_name = image_name.replace('/', '-')
+            assets.append(asset(self.base_url + image_url, 'images', image_name))
+
+        # Extract document links
+        doc_links = []
+        div = soup.find_all('section')
+        for section in div[3].find_all('div', class_='row baseline-offset--0-5 baseline-offset-bottom--0-5'):
+            a = section.find('a')['href']
+            b = section.find('a')
+            c = b.get('data-url')
+            doc_file = b.get_text(strip=True)
+            link = self.base_url + c if c else self.base_url + a
+            doc_links.append({'link_name': doc_file, 'link': link})
+
+        # Download document files
+        for doc_link in doc_links:
+            link_name = doc_link['link_name'].strip()
+            if link_name in shared_doc_folders:
+                assets.append(asset(doc_link['link'], label='file', shared=shared_doc_folders[link_name],
+                                    once=True, link_name=link_name))
+            elif link_name in product_doc_types:
+                assets.append(asset(doc_link['link'], 'doc_files', label='file', once=True))
+
+        data = ': \n'.join(doc['link_name'] for doc in doc_links if 'BIM' not in doc['link_name'])
+        data += ':'
+        product.update({'Product documentation & files': data})
+
+        return assets
+
+    def guide_page(self, url):
+        # A guide page that still fails after the retries is left to the end-of-run retry
+        try:
+            response = http_client.get(url)
+        except retry.network_errors as error:
+            print(f"Failed to fetch guide page. {error}, URL: {url}")
+            return None
+        if response.status_code != 200:
+            print(f"Failed to fetch guide page. Status code: {response.status_code}, URL: {url}")
+            return None
+        return make_soup(response.content)
+
+    def expand_asset(self, shared_asset):
+        # Guides link to a page listing the actual files
+        if shared_asset['link_name'] not in ('Installation Guide', 'Cleaning Guide'):
+            return [shared_asset]
+        soup = self.guide_page(shared_asset['url'])
+        if soup is None:
+            return None
+        if shared_asset['link_name'] == 'Installation Guide':
+            links = soup.find_all('a', href=True)
+        else:
+            overlay = soup.find('div', class_='downloads-overlay')
+            links = overlay.find_all('a', href=True) if overlay else []
+
+        # Keep the links that contain 'asset' in their href
+        return [asset(self.base_url + link['href'], label='file', shared=shared_asset['shared'], once=True)
+                for link in links if 'asset' in link['href']]
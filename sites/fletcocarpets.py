@@ -0,0 +1,85 @@
+from discovery import google_impressions
+from engine import Site, asset
+from parsing import only
+
+
+class FletcoCarpetsSite(Site):
+    name = 'fletcocarpets'
+    base_url = 'https://www.fletcocarpets.com'
+    listing_url = 'https://www.fletcocarpets.com/en/products/wall-to-wall-carpets'
+    sitemap_url = 'https://www.fletcocarpets.com/sitemap.xml'
+    discovery = ('feed', 'html')
+    feed_params = {
+        'feed': 'true',
+        'DoNotShowVariantsAsSingleProducts': 'True'
+    }
+    output_dir = 'fletcocarpets_products'
+    product_scope = only('div', 'page')
+
+    def parse_feed(self, response):
+        # The listing is requested as a JSON feed, so no HTML has to be parsed
+        products = list()
+        try:
+            json_data = response.json()
+            data = json_data[0].get('ProductsContainer')
+            for d in data:
+                product_name = d['Product'][0]['googleImpression']['name']
+                product_link = self.base_url + d['Product'][0]['googleImpression']['url']
+                products.append({'product_name': product_name, 'product_link': product_link})
+        except ValueError:
+            print("No JSON data found in the response.")
+        return products
+
+    def parse_listing(self, response):
+        # The listing page carries the same googleImpression objects as the feed
+        products = list()
+        seen = set()
+        for impression in google_impressions(response.text):
+            if impression.get('name') and impression.get('url') and impression['url'] not in seen:
+                seen.add(impression['url'])
+                products.append({'product_name': impression['name'],
+                                 'product_link': self.absolute_url(impression['url'])})
+        return products
+
+    def parse_product(self, soup, product):
+        product_info_div = soup.find('div', class_='page')
+        assets = []
+
+        # Extract image
+        image_div = product_info_div.find('div', class_='background-image image-filter image-filter--none dw-mod')
+        image_url = self.base_url + image_div.find('img')['src']
+        assets.append(asset(image_url, 'images', image_url.split('/')[-1]))
+
+        other_data_div = product_info_div.find('div', class_='grid grid--align-content-start')
+
+        # Available colours
+        for avin_div in other_data_div.find_all('div', class_='variant__wrapper'):
+            image = avin_div.find('img')
+            if image:
+                image_url = self.base_url + image['src']
+
+                image_data = avin_div.find_all('p')
+                color_name = image_data[1].get_text(strip=True)
+                variant_name = image_data[0].get_text(strip=True)
+
+                # Create the image name by combining color and variant
+                image_name = f"{color_name}-{variant_name}.{image_url.split('.')[-1]}"
+                assets.append(asset(image_url, 'available_colours', image_name))
+
+        # Extract description
+        desc_div = other_data_div.find('div', class_="grid__col-md-12 u-margin-bottom")
+        desc = ''
+        for paragraph in desc_div.find_all('p'):
+            if paragraph.get_text() != '':
+                desc += paragraph.get_text(strip=True)
+            else:
+                break
+        product.update({'description': desc})
+
+        # Extract doc files
+        doc_files_div = other_data_div.find_all('div', class_='grid__col-md-6 grid__col-sm-12 grid__col-xs-12')[-1]
+        for doc_file in doc_files_div.find_all('a', class_="product__document dw-mod"):
+            file_url = self.base_url + doc_file['href']
+            assets.append(asset(file_url, 'doc_files', file_url.split('/')[-1], label='document'))
+
+        return assets
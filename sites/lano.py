@@ -0,0 +1,86 @@
+from engine import Site, asset
+from parsing import make_soup, only
+
+
+class LanoSite(Site):
+    """Lano hospitality collection; the smartstrand collection shares the page layout."""
+
+    name = 'lano_hospitality'
+    base_url = 'https://www.lano.com'
+    listing_url = 'https://www.lano.com/en/hospitality'
+    sitemap_url = 'https://www.lano.com/sitemap.xml'
+    output_dir = 'lano_hospitality_products'
+    listing_scope = only('ul', 'product-overview')
+    product_scope = only('div', 'page-wrap')
+
+    def parse_listing(self, response):
+        soup = make_soup(response.content, parse_only=self.listing_scope)
+
+        # Extract the list of products
+        product_list = soup.find('ul', class_='product-overview')
+
+        products = list()
+        for product in product_list.find_all('div', class_='va-m'):
+            product_link = product.find('a')['href']
+            product_name = product.find('a').get_text(strip=True)
+            products.append({'product_name': product_name, 'product_link': self.absolute_url(product_link)})
+        return products
+
+    def description(self, product_head):
+        return product_head.find('p').get_text(strip=True) if product_head.find('p') else ''
+
+    def parse_product(self, soup, product):
+        product_info_div = soup.find('div', class_='page-wrap')
+        assets = []
+
+        # Image download
+        images_div = product_info_div.find('div', class_='product-slideshow-wrapper')
+        slideshow_div = images_div.find('div', class_='cycle-slideshow')
+        for image in slideshow_div.find_all('img'):
+            image_url = image['src']
+
+            # Name the image after its folder and file name in the URL
+            url_parts = image_url.strip('/').split('/')
+            image_name = f"{url_parts[-2]}-{url_parts[-1]}"
+            assets.append(asset(image_url, 'images', image_name))
+
+        # Extract product description
+        product_head = product_info_div.find('div', class_='description')
+        product.update({'description': self.description(product_head)})
+
+        # Extract available colors
+        colors_div = product_info_div.find('ul', class_='product-thumbs')
+        for image in colors_div.find_all('img'):
+            image_url = image['src']
+            assets.append(asset(image_url, 'available_colours', image_url.split('/')[-1]))
+
+        # Extract technical details
+        details_div = product_info_div.find('dl', class_='product-data')
+        technical_details = ''
+        for dt, dd in zip(details_div.find_all('dt'), details_div.find_all('dd')):
+            key = dt.get_text(strip=True) if dt.get_text(strip=True) else ''
+            value = dd.get_text(strip=True) if dd.get_text(strip=True) else ''
+            technical_details += f'{key} {value}\n'
+        product.update({'technical_details': technical_details})
+
+        # Extract doc files
+        tools_div = product_info_div.find('ul', class_='tools')
+        for d in tools_div.find_all('a'):
+            if d['title'] == 'Download PDF' and d['href'] != '':
+                file_name = product['product_name'].replace('/', '') + '.pdf'
+                assets.append(asset(d['href'], 'doc_files', file_name, label='document'))
+
+        return assets
+
+
+class LanoSmartstrandSite(LanoSite):
+    name = 'lano_smartstrand'
+    listing_url = 'https://www.lano.com/en/smartstrand'
+    output_dir = 'lano_smartstrand_products'
+
+    def description(self, product_head):
+        # Smartstrand products describe themselves as a bullet list
+        description_text = ''
+        for desc in product_head.find_all('li'):
+            description_text += '-' + desc.get_text(strip=True) + '\n'
+        return description_text
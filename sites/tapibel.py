@@ -0,0 +1,81 @@
+import os
+
+from engine import Site, asset
+from parsing import make_soup, only
+
+
+class TapibelSite(Site):
+    name = 'tapibel'
+    base_url = 'https://www.tapibel.be'
+    listing_url = 'https://www.tapibel.be/collections'
+    sitemap_url = 'https://www.tapibel.be/sitemap.xml'
+    output_dir = 'products'
+    listing_scope = only('div', 'collections_row')
+    product_scope = only('div', 'sections_group')
+
+    def parse_listing(self, response):
+        soup = make_soup(response.content, parse_only=self.listing_scope)
+
+        # Extract the list of products
+        product_list = soup.find('div', class_='collections_row')
+
+        products = list()
+        for product in product_list.find_all('div', class_='collection_content'):
+            product_link = product.find('a')['href']
+            product_name = product.find('a').get_text(strip=True)
+            products.append({'product_name': product_name, 'product_link': self.absolute_url(product_link)})
+        return products
+
+    def parse_product(self, soup, product):
+        main_div = soup.find('div', class_='sections_group')
+        assets = []
+
+        # Image download
+        images = main_div.find('div', class_='product_slider')
+        for image in images.find_all('img'):
+            image_url = image['src']
+            image_name = image_url.split('/')[-1]
+            assets.append(asset(image_url, 'images', image_name))
+
+        # Extract product description
+        product_head = main_div.find('div', class_='product_head')
+        description_paragraphs = product_head.find_all('p')
+
+        # Concatenate all paragraph texts into a single string
+        description_text = ''.join(paragraph.get_text(strip=True) for paragraph in description_paragraphs)
+        product.update({'description': description_text})
+
+        # Extract available locations
+        available_in_div = main_div.find('div', class_='cusrow')
+        product_buttons_div = available_in_div.find('div', class_='product_btns')
+
+        # Find all anchor tags and extract their text
+        locations = product_buttons_div.find_all('a')
+        available_in = '\n'.join(location.get_text(strip=True) for location in locations)
+        product.update({'available_in': available_in})
+
+        # Extract available colors
+        colors_div = main_div.find('div', class_='beschikbare_kleuren_inner')
+        thumbs_div = colors_div.find('div', class_='thumbs ff')
+        for image in thumbs_div.find_all('div', class_="productSlide"):
+            image_url = image.find('img')['src']
+            h5_text = image.find('h5').get_text(strip=True)
+            extension = os.path.splitext(image_url)[1]
+
+            image_name = f"{product['product_name']}-{h5_text}{extension}"
+            assets.append(asset(image_url, 'available_colours', image_name))
+
+        # Extract technical details
+        details_div = main_div.find('div', class_='technische-details_inner')
+        paragraphs = details_div.find_all('p')
+        technical_details = '\n'.join(p.get_text(strip=True) for p in paragraphs)
+        product.update({'technical_details': technical_details})
+
+        # Extract doc files
+        for d in details_div.find_all('a'):
+            file_url = d['href']
+            if file_url != '':
+                file_name = file_url.split('/')[-1]
+                assets.append(asset(file_url, 'doc_files', file_name, label='document'))
+
+        return assets
@@ -0,0 +1,195 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+settings = {
+    # Pages of a site kept before a compression dictionary is trained from them, and the pages sampled
+    'train_after': 64,
+    'max_samples': 2000,
+    'dictionary_size': 112 * 1024,
+    'level': 9,
+}
+
+# zlib can only refer back this far, so its dictionaries are no longer than this
+zlib_window = 32 * 1024
+
+codec = 'zstd' if zstandard else 'zlib'
+
+# Raised when the pages are too few or too alike to train a dictionary from
+training_errors = (zstandard.ZstdError, ValueError) if zstandard else (ValueError,)
+
+
+def train_dictionary(samples):
+    """Build a dictionary of what the ``samples`` pages have in common, for the available codec."""
+    if codec == 'zstd':
+        return zstandard.train_dictionary(settings['dictionary_size'], samples).as_bytes()
+    # zlib has no trainer; markup shared by the pages (head, navigation) sits near their start
+    share = max(zlib_window // min(len(samples), 16), 1)
+    return b''.join(sample[:share] for sample in samples[-16:])[-zlib_window:]
+
+
+def compress(content, dictionary=None):
+    if codec == 'zstd':
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=settings['level'], dict_data=dict_data).compress(content)
+    compressor = zlib.compressobj(settings['level'], zdict=dictionary) if dictionary else \
+        zlib.compressobj(settings['level'])
+    return compressor.compress(content) + compressor.flush()
+
+
+def decompress(data, page_codec, dictionary=None):
+    if page_codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("These snapshots are compressed with zstd: pip install zstandard")
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class SnapshotStore:
+    """Compressed copies of the listing and product pages the crawls fetched, for extracting again offline.
+
+    Pages are compressed with zstd, or zlib where the zstandard package isn't
+    installed. Pages of one site share most of their markup, so once
+    ``train_after`` of them are kept a dictionary is trained from them and
+    every page of the site is compressed with it. Only the latest version of
+    each URL is kept, in an SQLite file indexed by site, kind and URL.
+    """
+
+    def __init__(self, db_path='page_snapshots.db'):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS pages (
+                                 site TEXT,
+                                 kind TEXT,
+                                 url TEXT,
+                                 product_name TEXT,
+                                 content_hash TEXT,
+                                 size INTEGER,
+                                 codec TEXT,
+                                 dictionary_id INTEGER,
+                                 data BLOB,
+                                 fetched_at TEXT,
+                                 PRIMARY KEY (site, kind, url))''')
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS dictionaries (
+                                 id INTEGER PRIMARY KEY,
+                                 site TEXT,
+                                 codec TEXT,
+                                 data BLOB,
+                                 trained_at TEXT)''')
+        self.dictionaries = {}
+        # Page count at which training is tried again for a site, after samples too small to train from
+        self.train_at = {}
+        self.stored = 0
+        self.unchanged = 0
+
+    def dictionary(self, dictionary_id):
+        if dictionary_id is None:
+            return None
+        if dictionary_id not in self.dictionaries:
+            row = self.conn.execute('SELECT data FROM dictionaries WHERE id = ?', (dictionary_id,)).fetchone()
+            self.dictionaries[dictionary_id] = row[0]
+        return self.dictionaries[dictionary_id]
+
+    def site_dictionary(self, site):
+        # The newest dictionary of the site this installation can compress with
+        row = self.conn.execute('SELECT id FROM dictionaries WHERE site = ? AND codec = ? ORDER BY id DESC LIMIT 1',
+                                (site, codec)).fetchone()
+        return row[0] if row else None
+
+    def add(self, site, kind, url, content, product_name=None):
+        """Keep ``content`` as the latest ``kind`` page (``listing``, ``feed`` or ``product``) at ``url``."""
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self.lock:
+            row = self.conn.execute('SELECT content_hash FROM pages WHERE site = ? AND kind = ? AND url = ?',
+                                    (site, kind, url)).fetchone()
+            if row and row[0] == content_hash:
+                self.unchanged += 1
+                return
+            dictionary_id = self.site_dictionary(site)
+            data = compress(content, self.dictionary(dictionary_id))
+            with self.conn:
+                self.conn.execute('''INSERT OR REPLACE INTO pages
+                                     (site, kind, url, product_name, content_hash, size, codec, dictionary_id, data,
+                                      fetched_at)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                                  (site, kind, url, product_name, content_hash, len(content), codec, dictionary_id,
+                                   data, time.strftime('%Y-%m-%d %H:%M:%S')))
+            self.stored += 1
+            if dictionary_id is None:
+                self.train(site)
+
+    def train(self, site):
+        """Train the site's dictionary once enough pages are kept, and recompress its pages with it."""
+        count = self.conn.execute('SELECT COUNT(*) FROM pages WHERE site = ?', (site,)).fetchone()[0]
+        if count < self.train_at.get(site, settings['train_after']):
+            return
+        rows = self.conn.execute('SELECT kind, url, codec, dictionary_id, data FROM pages WHERE site = ?',
+                                 (site,)).fetchall()
+        pages = [(kind, url, decompress(data, page_codec, self.dictionary(dictionary_id)))
+                 for kind, url, page_codec, dictionary_id, data in rows]
+        samples = [content for _, _, content in pages[-settings['max_samples']:]]
+        try:
+            dictionary = train_dictionary(samples)
+        except training_errors as error:
+            print(f"Could not train a compression dictionary for {site} yet. {error}")
+            self.train_at[site] = 2 * count
+            return
+
+        with self.conn:
+            cursor = self.conn.execute('INSERT INTO dictionaries (site, codec, data, trained_at) VALUES (?, ?, ?, ?)',
+                                       (site, codec, dictionary, time.strftime('%Y-%m-%d %H:%M:%S')))
+            dictionary_id = cursor.lastrowid
+            self.conn.executemany('''UPDATE pages SET codec = ?, dictionary_id = ?, data = ?
+                                     WHERE site = ? AND kind = ? AND url = ?''',
+                                  [(codec, dictionary_id, compress(content, dictionary), site, kind, url)
+                                   for kind, url, content in pages])
+        self.dictionaries[dictionary_id] = dictionary
+
+    def pages(self, site, kind='product'):
+        """Yield ``({'product_name', 'product_link'}, content)`` for every kept ``kind`` page of ``site``."""
+        with self.lock:
+            rows = self.conn.execute('SELECT url FROM pages WHERE site = ? AND kind = ? ORDER BY rowid',
+                                     (site, kind)).fetchall()
+        for (url,) in rows:
+            with self.lock:
+                row = self.conn.execute('''SELECT product_name, codec, dictionary_id, data FROM pages
+                                           WHERE site = ? AND kind = ? AND url = ?''', (site, kind, url)).fetchone()
+            product_name, page_codec, dictionary_id, data = row
+            yield ({'product_name': product_name, 'product_link': url},
+                   decompress(data, page_codec, self.dictionary(dictionary_id)))
+
+    def summary(self, site):
+        with self.lock:
+            pages, size, stored = self.conn.execute('''SELECT COUNT(*), COALESCE(SUM(size), 0),
+                                                       COALESCE(SUM(LENGTH(data)), 0)
+                                                       FROM pages WHERE site = ?''', (site,)).fetchone()
+            dictionaries = self.conn.execute('''SELECT COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries
+                                                WHERE id IN (SELECT dictionary_id FROM pages WHERE site = ?)''',
+                                             (site,)).fetchone()[0]
+        # The dictionaries count against the ratio, they have to be kept too
+        stored += dictionaries
+        return {
+            'pages': pages,
+            'megabytes': round(size / (1024 * 1024), 2),
+            'stored_megabytes': round(stored / (1024 * 1024), 2),
+            'compression_ratio': round(size / stored, 1) if stored else 1.0,
+        }
+
+    def print_summary(self, site):
+        stats = self.summary(site)
+        print(f"Snapshots: {self.stored} pages stored, {self.unchanged} unchanged; {stats['pages']} pages "
+              f"({stats['megabytes']} MB) kept in {stats['stored_megabytes']} MB, "
+              f"compression ratio {stats['compression_ratio']}")
+
+    def close(self):
+        self.conn.close()
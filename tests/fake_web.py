@@ -0,0 +1,108 @@
+import json
+import os
+from urllib.parse import urlparse
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def read_fixture(name):
+    with open(os.path.join(fixtures, name), 'rb') as file:
+        return file.read()
+
+
+# Each golden site: the scraper it was produced with at baseline, its one-product listing and its pages
+sites = {
+    'bolon': {
+        'script': 'bolon_scraper.py',
+        'product_name': 'Bolon Sample',
+        'product_link': 'https://www.bolon.com/en/products/floors/sample',
+        'page': 'bolon_product.html',
+        'pages': {
+            'https://www.bolon.com/en/products/floors':
+                b'<html><body><ul class="product-list columns"><li class="product-list__item">'
+                b'<a href="/en/products/floors/sample"><h4 class="product-list__item-title">Bolon Sample</h4></a>'
+                b'</li></ul></body></html>',
+            'https://www.bolon.com/en/installation-guide': 'bolon_installation_guide.html',
+            'https://www.bolon.com/en/cleaning-guide': 'bolon_cleaning_guide.html',
+        },
+    },
+    'fletcocarpets': {
+        'script': 'fletcocarpets_scraper.py',
+        'product_name': 'Aura',
+        'product_link': 'https://www.fletcocarpets.com/en/aura',
+        'page': 'fletcocarpets_product.html',
+        'pages': {
+            'https://www.fletcocarpets.com/en/products/wall-to-wall-carpets': json.dumps(
+                [{'ProductsContainer': [{'Product': [{'googleImpression': {'name': 'Aura', 'url': '/en/aura'}}]}]}]
+            ).encode(),
+        },
+    },
+    'lano_hospitality': {
+        'script': 'lano_hospitality_scraper.py',
+        'product_name': 'Product 7',
+        'product_link': 'https://www.lano.com/en/products/7',
+        'page': 'lano_product.html',
+        'pages': {
+            'https://www.lano.com/en/hospitality':
+                b'<html><body><ul class="product-overview"><li><div class="va-m">'
+                b'<a href="/en/products/7">Product 7</a></div></li></ul></body></html>',
+        },
+    },
+    'lano_smartstrand': {
+        'script': 'lano_smartstand_scraper.py',
+        'product_name': 'Product 7',
+        'product_link': 'https://www.lano.com/en/products/7',
+        'page': 'lano_smartstrand_product.html',
+        'pages': {
+            'https://www.lano.com/en/smartstrand':
+                b'<html><body><ul class="product-overview"><li><div class="va-m">'
+                b'<a href="/en/products/7">Product 7</a></div></li></ul></body></html>',
+        },
+    },
+    'tapibel': {
+        'script': 'tapibel_scraper.py',
+        'product_name': 'Aqua',
+        'product_link': 'https://www.tapibel.be/collections/aqua',
+        'page': 'tapibel_product.html',
+        'pages': {
+            'https://www.tapibel.be/collections':
+                b'<html><body><div class="collections_row"><div class="collection_content">'
+                b'<a href="/collections/aqua">Aqua</a></div></div></body></html>',
+        },
+    },
+}
+
+
+class FakeResponse:
+    """The parts of a ``requests.Response`` the scrapers read."""
+
+    def __init__(self, url, content, headers=None):
+        self.url = url
+        self.status_code = 200
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def asset_name(url):
+    return os.path.basename(urlparse(url).path)
+
+
+def fake_get(site_name):
+    """A ``requests.get`` serving the site's pages; any other URL is a file whose content is its URL."""
+    site = sites[site_name]
+    pages = dict(site['pages'], **{site['product_link']: site['page']})
+
+    def get(url, **kwargs):
+        page = pages.get(url)
+        if page is None:
+            return FakeResponse(url, f'content of {url}'.encode(),
+                                {'Content-Disposition': f'attachment; filename="{asset_name(url)}"'})
+        return FakeResponse(url, read_fixture(page) if isinstance(page, str) else page)
+    return get
@@ -0,0 +1,65 @@
+"""Write tests/fixtures/golden/<site>.json by running each baseline scraper over the fixture pages.
+
+The scripts are taken from the baseline commit as they were before the engine
+existed, and run with ``requests.get`` answered by ``fake_web``. What they
+write (the product CSV and every file, by the URL it came from) is the
+expected output ``test_golden.py`` compares the engine against.
+
+    python tests/make_golden.py [BASELINE_COMMIT]
+"""
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import requests
+
+import fake_web
+
+baseline_commit = '5d8d05e'
+golden_dir = os.path.join(fake_web.fixtures, 'golden')
+
+
+def run_baseline(site_name, commit):
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    source = subprocess.run(['git', 'show', f"{commit}:{fake_web.sites[site_name]['script']}"], cwd=repo_root,
+                            check=True, capture_output=True, text=True).stdout
+    original_get = requests.get
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        requests.get = fake_web.fake_get(site_name)
+        try:
+            exec(compile(source, fake_web.sites[site_name]['script'], 'exec'), {'__name__': '__main__'})
+        finally:
+            requests.get = original_get
+            os.chdir(cwd)
+        return read_output(directory)
+
+
+def read_output(directory):
+    rows, files = {}, {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory)
+            if name == 'product_data.csv':
+                with open(path, newline='', encoding='utf-8') as file:
+                    rows[relative] = list(csv.reader(file))
+            else:
+                with open(path, 'rb') as file:
+                    files[relative] = file.read().decode().removeprefix('content of ')
+    return {'csv': rows, 'files': dict(sorted(files.items()))}
+
+
+if __name__ == '__main__':
+    commit = sys.argv[1] if len(sys.argv) > 1 else baseline_commit
+    os.makedirs(golden_dir, exist_ok=True)
+    for site_name in fake_web.sites:
+        output = run_baseline(site_name, commit)
+        with open(os.path.join(golden_dir, f'{site_name}.json'), 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2, ensure_ascii=False)
+            file.write('\n')
+        print(f"{site_name}: {len(output['csv'])} products, {len(output['files'])} files")
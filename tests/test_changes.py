@@ -0,0 +1,47 @@
+import os
+
+from engine import Run
+from test_manifest import CatalogueHandler, local_bolon, products
+
+
+class SitemapHandler(CatalogueHandler):
+    def do_GET(self):
+        if self.path != '/sitemap.xml':
+            super().do_GET()
+            return
+        entries = ''.join(f'<url><loc>http://{self.headers["Host"]}/p/{slug}</loc><lastmod>2026-10-01</lastmod></url>'
+                          for slug in products)
+        body = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def crawl(site):
+    """Run one crawl and return how many products it skipped as unchanged in the sitemap."""
+    run = Run(site, max_workers=4, snapshots=False)
+    completed = False
+    try:
+        for product in run.fetch_listing():
+            run.scrape_product(product)
+        completed = True
+    finally:
+        run.finish(completed)
+    return run.changes.skipped
+
+
+def test_sitemap_skips_counted_only_when_taken(serve, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CatalogueHandler, 'hits', {})
+    base_url = serve(SitemapHandler)
+    site = local_bolon(base_url)
+    site.sitemap_url = f'{base_url}/sitemap.xml'
+
+    assert crawl(site) == 0
+    # A resumed crawl can't trust the lastmods, so it fetches the pages and counts no skip
+    open(os.path.join(site.output_dir, '.bolon_checkpoint.jsonl'), 'w').close()
+    assert crawl(site) == 0
+    assert CatalogueHandler.hits['/p/alpha'] == 2
+    assert crawl(site) == len(products)
+    assert CatalogueHandler.hits['/p/alpha'] == 2
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from engine import run
+from test_manifest import CatalogueHandler, local_bolon
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+crawl_script = f'''
+import sys
+sys.path[:0] = [{os.path.dirname(tests_dir)!r}, {tests_dir!r}]
+from engine import run
+from test_manifest import local_bolon
+run(local_bolon(sys.argv[1]), max_workers=4, snapshots=False)
+'''
+
+
+class StalledDocumentsHandler(CatalogueHandler):
+    # Documents hang until released, so the crawl can be killed with every product page parsed
+    # but none of the products' downloads done
+    release = threading.Event()
+    stalled = []
+
+    def do_GET(self):
+        if self.path.startswith('/docs/'):
+            self.stalled.append(self.path)
+            self.release.wait(30)
+        super().do_GET()
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.05)
+
+
+def test_crawl_killed_mid_download_is_resumed(serve, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CatalogueHandler, 'hits', {})
+    base_url = serve(StalledDocumentsHandler)
+    site = local_bolon(base_url)
+    csv_paths = [os.path.join(site.output_dir, name, 'product_data.csv') for name in ('Alpha', 'Beta')]
+
+    crawl = subprocess.Popen([sys.executable, '-c', crawl_script, base_url], cwd=tmp_path,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(lambda: all(os.path.exists(path) for path in csv_paths) and StalledDocumentsHandler.stalled)
+    finally:
+        crawl.kill()
+        crawl.wait()
+        StalledDocumentsHandler.release.set()
+
+    # The pages are unchanged, but the products must not be skipped as their documents never arrived
+    run(site, max_workers=4, snapshots=False)
+    specifications = os.path.join(site.output_dir, 'Product_Specification')
+    assert sorted(os.listdir(specifications)) == ['spec-alpha.pdf', 'spec-beta.pdf']
+    for name in ('Alpha', 'Beta'):
+        assert os.listdir(os.path.join(site.output_dir, name, 'doc_files')) == ['texture.pdf']
+    assert not os.path.exists(os.path.join(site.output_dir, '.bolon_checkpoint.jsonl'))
@@ -0,0 +1,53 @@
+import gzip
+
+import discovery
+from fake_web import FakeResponse, read_fixture
+from sites.fletcocarpets import FletcoCarpetsSite
+
+sitemap_urls = [
+    ('https://www.tapibel.be/collections/aqua', '2026-09-30T08:12:00+00:00'),
+    ('https://www.tapibel.be/collections/terra', None),
+]
+
+
+def test_parse_sitemap():
+    # Entries without a <loc> are left out, and lastmod is optional
+    assert discovery.parse_sitemap(read_fixture('sitemap.xml')) == (sitemap_urls, [])
+
+
+def test_parse_sitemap_index_and_gzip():
+    assert discovery.parse_sitemap(read_fixture('sitemap_index.xml')) == (
+        [], ['https://www.tapibel.be/sitemap-collections.xml.gz', 'https://www.tapibel.be/sitemap-pages.xml'])
+    # A .gz sitemap served without Content-Encoding is still compressed
+    assert discovery.parse_sitemap(gzip.compress(read_fixture('sitemap.xml'))) == (sitemap_urls, [])
+
+
+def test_sitemap_entries_follow_the_index(monkeypatch):
+    pages = {
+        'https://www.tapibel.be/sitemap.xml': read_fixture('sitemap_index.xml'),
+        'https://www.tapibel.be/sitemap-collections.xml.gz': gzip.compress(read_fixture('sitemap.xml')),
+        'https://www.tapibel.be/sitemap-pages.xml': b'<urlset',
+    }
+    monkeypatch.setattr(discovery.http_client, 'get', lambda url, **kwargs: FakeResponse(url, pages[url]))
+
+    # The unreadable nested sitemap is skipped, the others are merged
+    assert discovery.sitemap_entries('https://www.tapibel.be/sitemap.xml') == dict(sitemap_urls)
+
+
+def test_google_impressions():
+    impressions = list(discovery.google_impressions(read_fixture('fletcocarpets_listing.html').decode('utf-8')))
+    # Escaped attribute values are read too; the cut off and null impressions are skipped
+    assert impressions == [
+        {'name': 'Aura', 'url': '/en/aura', 'list': 'Wall-to-wall'},
+        {'name': 'Bouclé & Co', 'url': '/en/boucle'},
+        {'name': 'Aura', 'url': '/en/aura'},
+    ]
+
+
+def test_fletco_listing_from_google_impressions():
+    site = FletcoCarpetsSite()
+    listing = FakeResponse(site.listing_url, read_fixture('fletcocarpets_listing.html'))
+    assert site.parse_listing(listing) == [
+        {'product_name': 'Aura', 'product_link': 'https://www.fletcocarpets.com/en/aura'},
+        {'product_name': 'Bouclé & Co', 'product_link': 'https://www.fletcocarpets.com/en/boucle'},
+    ]
@@ -0,0 +1,52 @@
+import csv
+import json
+import os
+
+import pytest
+
+import fake_web
+import http_client
+from engine import extract_product, write_product_csv
+from sites import SITES
+
+
+def load_golden(site_name):
+    with open(os.path.join(fake_web.fixtures, 'golden', f'{site_name}.json'), encoding='utf-8') as file:
+        return json.load(file)
+
+
+def planned_files(site, product_name, assets):
+    """Where the engine puts each asset, as ``{path: url}``, the way ``Run.queue_asset`` lays them out."""
+    files = {}
+    for product_asset in assets:
+        if product_asset['shared'] is None:
+            folder = os.path.join(site.product_folder(product_name), product_asset['kind'])
+            file_assets = [product_asset]
+        else:
+            folder = os.path.join(site.output_dir, product_asset['shared'])
+            file_assets = site.expand_asset(product_asset)
+        for file_asset in file_assets:
+            # fake_web names every file after its URL in Content-Disposition
+            filename = file_asset['filename'] or fake_web.asset_name(file_asset['url'])
+            files[os.path.join(folder, filename)] = file_asset['url']
+    return dict(sorted(files.items()))
+
+
+@pytest.mark.parametrize('site_name', sorted(fake_web.sites))
+def test_extract_product_matches_baseline_output(site_name, tmp_path, monkeypatch):
+    """The engine's extractor writes the same CSV and files as the original scraper did for the same page."""
+    site = SITES[site_name]
+    golden = load_golden(site_name)
+    page = fake_web.sites[site_name]
+    # Bolon's guide pages are read while its shared documents are expanded
+    monkeypatch.setattr(http_client, 'get', fake_web.fake_get(site_name))
+
+    product = {'product_name': page['product_name'], 'product_link': page['product_link']}
+    product, assets, _ = extract_product(site, product, fake_web.read_fixture(page['page']))
+    assert planned_files(site, product['product_name'], assets) == golden['files']
+
+    product.pop('product_link')
+    csv_path = os.path.join(site.product_folder(product['product_name']), 'product_data.csv')
+    write_product_csv(str(tmp_path / 'product_data.csv'), product)
+    with open(tmp_path / 'product_data.csv', newline='', encoding='utf-8') as file:
+        assert {csv_path: list(csv.reader(file))} == golden['csv']
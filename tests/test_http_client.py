@@ -0,0 +1,34 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+import http_client
+import metrics
+
+
+class SmallPageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'page'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_connect_is_timed_once_per_kept_alive_connection(serve):
+    base_url = serve(SmallPageHandler)
+    host = urlparse(base_url).netloc
+    metrics.reset()
+    http_client.close_sessions()
+
+    for page in range(3):
+        assert http_client.get(f'{base_url}/page-{page}').content == b'page'
+    http_client.close_sessions()
+
+    records = {(record['metric'], record['labels'].get('host')): record for record in metrics.snapshot()}
+    assert records['connect_seconds', host]['count'] == 1
+    assert records['responses', host]['value'] == 3
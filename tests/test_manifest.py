@@ -0,0 +1,126 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler
+
+from asset_store import BlobStore
+from downloader import AssetDownloader
+from engine import run
+from manifest import DownloadManifest
+from sites.bolon import BolonSite
+
+# Two products, each with its own specification PDF and a texture sheet they share
+products = {
+    'alpha': 'Alpha',
+    'beta': 'Beta',
+}
+
+
+def listing_page():
+    items = ''.join(f'<li class="product-list__item"><a href="/p/{slug}">'
+                    f'<h4 class="product-list__item-title">{name}</h4></a></li>' for slug, name in products.items())
+    return f'<html><body><ul class="product-list columns">{items}</ul></body></html>'
+
+
+def product_page(slug, version):
+    documents = (('Product Specification', f'/docs/spec-{slug}.pdf'), ('Texture', '/docs/texture.pdf'))
+    row_class = 'row baseline-offset--0-5 baseline-offset-bottom--0-5'
+    rows = ''.join(f'<div class="{row_class}"><a href="{href}">{name}</a></div>' for name, href in documents)
+    return f'''<html><body>
+        <section class="hero"><h1>{slug}</h1></section>
+        <section class="product-slideshow"><ul class="product-slideshow__thumbs small-block-grid-2">
+        <li><img src="/img/cover-{slug}.jpg"></li></ul></section>
+        <section class="info">
+        <div class="row show-for-medium-up"><p class="paragraphed-gen5">{slug} version {version}</p></div>
+        <div class="row baseline-offset--1">
+        <div class="small-12 columns"></div><div class="small-12 columns"></div></div>
+        </section>
+        <section class="docs">{rows}</section>
+        </body></html>'''
+
+
+class CatalogueHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Requests per path, and the version shown on product pages so every run parses them again
+    hits = {}
+    version = 1
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        headers = {}
+        if self.path == '/listing':
+            body = listing_page().encode()
+        elif self.path.startswith('/p/'):
+            body = product_page(self.path.rsplit('/', 1)[-1], self.version).encode()
+        elif self.path.startswith(('/docs/', '/img/')):
+            # A different document per URL, named by Content-Disposition like Bolon's
+            body = f'content of {self.path}'.encode()
+            headers['Content-Disposition'] = f'attachment; filename="{os.path.basename(self.path)}"'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def local_bolon(base_url):
+    site = BolonSite()
+    site.base_url = base_url
+    site.listing_url = f'{base_url}/listing'
+    site.sitemap_url = None
+    site.discovery = ()
+    return site
+
+
+def test_per_product_documents_and_once(serve, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(CatalogueHandler, 'hits', {})
+    base_url = serve(CatalogueHandler)
+    site = local_bolon(base_url)
+
+    run(site, max_workers=4, snapshots=False)
+    specifications = os.path.join(site.output_dir, 'Product_Specification')
+    assert sorted(os.listdir(specifications)) == ['spec-alpha.pdf', 'spec-beta.pdf']
+    with open(os.path.join(specifications, 'spec-beta.pdf'), 'rb') as file:
+        assert file.read() == b'content of /docs/spec-beta.pdf'
+    for name in products.values():
+        assert os.listdir(os.path.join(site.output_dir, name, 'doc_files')) == ['texture.pdf']
+
+    # The pages changed, so both products are parsed again, but no once document is fetched twice
+    monkeypatch.setattr(CatalogueHandler, 'version', 2)
+    run(site, max_workers=4, snapshots=False)
+    assert CatalogueHandler.hits['/p/alpha'] == CatalogueHandler.hits['/p/beta'] == 2
+    for document in ('/docs/spec-alpha.pdf', '/docs/spec-beta.pdf', '/docs/texture.pdf'):
+        assert CatalogueHandler.hits[document] == 1, document
+
+
+def test_url_known_to_the_manifest_is_linked_to_other_paths(serve, tmp_path, monkeypatch):
+    monkeypatch.setattr(CatalogueHandler, 'hits', {})
+    url = serve(CatalogueHandler) + '/img/cover-s.jpg'
+    first, second = str(tmp_path / 'a' / 's.jpg'), str(tmp_path / 'b' / 's.jpg')
+    os.makedirs(os.path.dirname(first))
+    os.makedirs(os.path.dirname(second))
+
+    def download(*paths):
+        manifest = DownloadManifest(str(tmp_path / 'manifest.db'))
+        downloader = AssetDownloader(store=BlobStore(str(tmp_path / 'store')), manifest=manifest)
+        for path in paths:
+            downloader.submit(url, path, once=True)
+        stats = downloader.wait()
+        manifest.close()
+        return stats
+
+    download(first)
+    stats = download(first, second)
+    assert stats['failed'] == 0
+    assert CatalogueHandler.hits['/img/cover-s.jpg'] == 1
+    with open(second, 'rb') as file:
+        assert file.read() == b'content of /img/cover-s.jpg'
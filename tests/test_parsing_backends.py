@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import parsing
+import WebScraping1
+from engine import extract_product
+from fake_web import read_fixture, sites
+from sites import SITES
+
+# Product page fixture of each site, in the layout its extractor reads
+product_pages = {name: (site['page'], site['product_name'], site['product_link']) for name, site in sites.items()}
+
+backends = parsing.available_backends()
+needs_two_backends = pytest.mark.skipif(len(backends) < 2, reason='only html.parser is installed')
+
+
+def extract_with(backend, site, filename, product_name, product_link):
+    parsing.set_parser(backend)
+    product = {'product_name': product_name, 'product_link': product_link}
+    product, assets, _ = extract_product(site, product, read_fixture(filename))
+    return product, assets
+
+
+@pytest.fixture(autouse=True)
+def restore_parser():
+    parser = parsing.settings['parser']
+    yield
+    parsing.set_parser(parser)
+
+
+@needs_two_backends
+@pytest.mark.parametrize('site_name', sorted(product_pages))
+def test_extract_product_matches_across_backends(site_name):
+    site = SITES[site_name]
+    expected = extract_with('html.parser', site, *product_pages[site_name])
+    assert expected[1], 'the fixture should produce assets'
+    for backend in backends:
+        assert extract_with(backend, site, *product_pages[site_name]) == expected, backend
+
+
+def extract_jobs(content):
+    results = {}
+    for backend in backends:
+        parsing.set_parser(backend)
+        soup = parsing.make_soup(content, parse_only=WebScraping1.job_scope)
+        jobs = [WebScraping1.scrape_job(job) for job in soup.find_all('div', class_='item premium big-item')]
+        # The timestamp is the time of scraping, not part of the page
+        results[backend] = [{key: value for key, value in job.items() if key != 'Timestamp'} for job in jobs]
+        results[backend, 'pages'] = WebScraping1.discover_page_count(parsing.make_soup(content))
+    return results
+
+
+@needs_two_backends
+def test_job_listing_matches_across_backends():
+    results = extract_jobs(read_fixture('visidarbi_listing.html'))
+    assert len(results['html.parser']) == 3
+    for backend in backends:
+        assert results[backend] == results['html.parser'], backend
+        assert results[backend, 'pages'] == results['html.parser', 'pages'] == 14, backend
+
+
+def test_html_parser_is_the_default():
+    if not os.environ.get('SCRAPER_PARSER'):
+        assert parsing.settings['parser'] == 'html.parser'
+
+
+# lxml closes unclosed <p> and <li> tags where html.parser nests what follows inside them, so the
+# extracted text differs. This is why html.parser stays the default until pages are checked per site.
+@needs_two_backends
+@pytest.mark.xfail(strict=True, reason='lxml and html.parser repair unclosed tags differently')
+def test_unclosed_paragraph_matches_across_backends():
+    site = SITES['lano_hospitality']
+    filename, product_name, product_link = product_pages['lano_hospitality']
+    content = read_fixture(filename).replace(b'care</p>', b'care<p>Second paragraph')
+    results = []
+    for backend in backends:
+        parsing.set_parser(backend)
+        product = {'product_name': product_name, 'product_link': product_link}
+        results.append(extract_product(site, product, content)[:2])
+    assert all(result == results[0] for result in results)
+
+
+@needs_two_backends
+@pytest.mark.xfail(strict=True, reason='lxml and html.parser repair unclosed tags differently')
+def test_unclosed_list_items_match_across_backends():
+    results = extract_jobs(read_fixture('visidarbi_listing.html').replace(b'</li>', b''))
+    for backend in backends:
+        assert results[backend] == results['html.parser'], backend
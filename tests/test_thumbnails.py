@@ -0,0 +1,39 @@
+import hashlib
+import os
+
+import pytest
+
+import thumbnails
+from manifest import DownloadManifest
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def save_picture(manifest, path, image):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path, 'PNG')
+    with open(path, 'rb') as file:
+        content_hash = hashlib.sha256(file.read()).hexdigest()
+    manifest.record(f'https://example.com/{path}', path, content_hash, os.path.getsize(path))
+
+
+def test_variants_only_for_the_run_products_and_bombs_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(thumbnails.settings, 'sizes', (None, 16))
+    monkeypatch.setitem(thumbnails.settings, 'formats', ('webp',))
+    manifest = DownloadManifest()
+    # Two sites writing to one output folder, and a picture too large to decode safely
+    save_picture(manifest, os.path.join('products', 'Alpha', 'images', 'alpha.png'), Image.new('RGB', (64, 48)))
+    save_picture(manifest, os.path.join('products', 'Other', 'images', 'other.png'), Image.new('RGB', (64, 48)))
+    save_picture(manifest, os.path.join('products', 'Huge', 'images', 'huge.png'), Image.new('1', (14000, 14000)))
+
+    stage = thumbnails.ThumbnailStage(processes=1)
+    thumbnails.make_variants(stage, manifest, 'products', {os.path.join('products', 'Alpha'),
+                                                           os.path.join('products', 'Huge')}, 'bolon')
+    manifest.close()
+
+    assert sorted(os.listdir(os.path.join('products', 'Alpha', 'images', 'variants'))) == [
+        'alpha.png-16.webp', 'alpha.png-full.webp']
+    assert not os.path.exists(os.path.join('products', 'Other', 'images', 'variants'))
+    assert not os.path.exists(os.path.join('products', 'Huge', 'images', 'variants'))
+    assert stage.summary()['pictures'] == 2 and stage.summary()['failed'] == 1
@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import metrics
+from asset_store import BlobStore
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Longest edge in pixels of every variant (None keeps the picture's own size), and the formats of each
+settings = {
+    'sizes': (None, 1200, 400, 160),
+    'formats': ('webp', 'avif'),
+    'quality': 80,
+}
+
+# Product subfolders holding pictures; documents are left alone
+image_kinds = ('images', 'available_colours')
+image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tif', '.tiff')
+
+# Variants are linked into this subfolder next to each picture
+variants_folder = 'variants'
+
+
+def configure(**options):
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown thumbnail settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+
+
+def available_formats():
+    # AVIF needs Pillow 11.3 or newer, or the pillow-avif-plugin package on older ones
+    try:
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        pass
+    Image.init()
+    return [fmt for fmt in settings['formats'] if fmt.upper() in Image.SAVE]
+
+
+def variant_key(content_hash, size, fmt):
+    return f"{content_hash}-{size or 'full'}.{fmt}"
+
+
+def variant_path(path, size, fmt):
+    # The picture's own extension stays in the name, so a.jpg and a.png in one folder don't share variants
+    return os.path.join(os.path.dirname(path), variants_folder, f"{os.path.basename(path)}-{size or 'full'}.{fmt}")
+
+
+def is_picture(path):
+    folder = os.path.basename(os.path.dirname(path))
+    return folder in image_kinds and os.path.splitext(path)[1].lower() in image_extensions
+
+
+def render_variants(source_path, variants, quality):
+    """Decode one picture and write each ``(size, fmt, staged_path)`` variant of it.
+
+    Runs in a worker process: the picture is opened once for all its variants.
+    """
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        for size, fmt, staged_path in variants:
+            variant = image
+            if size:
+                # Keeps the aspect ratio and never enlarges
+                variant = image.copy()
+                variant.thumbnail((size, size), Image.LANCZOS)
+            variant.save(staged_path, fmt.upper(), quality=quality)
+
+
+class ThumbnailStage:
+    """Resized WebP/AVIF variants of the downloaded pictures, made on a process pool.
+
+    Variants are stored once per picture content in a ``BlobStore`` of their
+    own, as ``<content hash>-<size>.<format>``, and linked into a ``variants``
+    folder next to each picture. A picture whose content hash hasn't changed
+    since an earlier run is therefore not decoded again, and a swatch shared
+    by many products is only resized once.
+    """
+
+    def __init__(self, root='variant_store', processes=None):
+        if Image is None:
+            raise ImportError("The thumbnail stage needs Pillow: pip install Pillow")
+        self.store = BlobStore(root)
+        self.processes = processes
+        self.formats = available_formats()
+        skipped = set(settings['formats']) - set(self.formats)
+        if skipped:
+            print(f"Thumbnails: this Pillow can't write {', '.join(sorted(skipped))}, skipping those variants")
+        self.pictures = 0
+        self.rendered = 0
+        self.reused = 0
+        self.failed = 0
+
+    def run(self, pictures):
+        """Make the missing variants of ``(path, content_hash)`` pictures and link them into place."""
+        # Variants to make, grouped by picture content so each picture is decoded once
+        renders = {}
+        queued = set()
+        links = []
+        for path, content_hash in pictures:
+            self.pictures += 1
+            for size in settings['sizes']:
+                for fmt in self.formats:
+                    key = variant_key(content_hash, size, fmt)
+                    links.append((key, variant_path(path, size, fmt)))
+                    if self.store.has(key):
+                        self.reused += 1
+                    elif key not in queued:
+                        queued.add(key)
+                        staged_path = os.path.join(self.store.root, f".{key}.part")
+                        renders.setdefault(content_hash, (path, []))[1].append((size, fmt, staged_path, key))
+
+        if renders:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                futures = {pool.submit(render_variants, source_path,
+                                       [variant[:3] for variant in variants], settings['quality']):
+                           (source_path, variants) for source_path, variants in renders.values()}
+                for future in as_completed(futures):
+                    source_path, variants = futures[future]
+                    try:
+                        future.result()
+                    except (OSError, ValueError, Image.DecompressionBombError) as error:
+                        # Not a picture Pillow can read, e.g. an SVG or a truncated download, or one with
+                        # so many pixels that decoding it could exhaust the memory
+                        print(f"Failed to make variants of {source_path}. {error}")
+                        self.failed += 1
+                        for _, _, staged_path, _ in variants:
+                            if os.path.exists(staged_path):
+                                os.remove(staged_path)
+                        continue
+                    for _, _, staged_path, key in variants:
+                        self.store.ingest(staged_path, key)
+                        self.rendered += 1
+
+        for key, path in links:
+            if self.store.has(key):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.store.link(key, path)
+
+    def summary(self):
+        return {
+            'pictures': self.pictures,
+            'rendered': self.rendered,
+            'reused': self.reused,
+            'failed': self.failed,
+            'megabytes': round(self.store.stored_bytes / (1024 * 1024), 2),
+        }
+
+    def print_summary(self):
+        stats = self.summary()
+        print(f"Thumbnails: {stats['rendered']} variants made ({stats['megabytes']} MB), "
+              f"{stats['reused']} unchanged, for {stats['pictures']} pictures; {stats['failed']} unreadable")
+
+
+def make_variants(stage, manifest, output_dir, product_folders, site_name):
+    # Every picture the manifest has in the run's product folders, downloaded this run or before. Sites may
+    # share an output folder, so pictures of another site's products are left to that site's runs
+    pictures = [(path, content_hash) for path, content_hash in manifest.files_under(output_dir)
+                if is_picture(path) and os.path.dirname(os.path.dirname(path)) in product_folders]
+    with metrics.timed('thumbnails', site=site_name):
+        stage.run(pictures)